@@ -1,19 +1,115 @@
-from flask import Flask, render_template_string, abort, request, url_for
+import click
+from flask import Flask, abort, request, url_for, jsonify, Response, g, stream_with_context, has_request_context, send_file
+from jinja2 import DictLoader
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import is_resource_modified
+from werkzeug.routing import PathConverter
+from functools import wraps
 import os
+import posixpath
+import shutil
+import stat
 import markdown
-from functools import lru_cache
+import hashlib
+import gzip
+import json
+import pickle
+import sqlite3
+from collections import OrderedDict
 import yaml
 import logging
 import re
-from bs4 import BeautifulSoup
-from datetime import datetime  # Added import
+import threading
+import gc
+import inspect
+import sys
+import bisect
+import heapq
+import math
+from array import array
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import quote, urlencode
+from datetime import date, datetime, timedelta, timezone  # Added import
+
+try:
+    import brotli
+except ImportError:  # Only gzip is offered without it
+    brotli = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Images are served at full size without it
+    Image = None
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Fall back to polling the md folder
+    Observer = None
+    FileSystemEventHandler = object
+
+def env_setting(name, default):
+    """Read BLOG_<name> from the environment, cast to the type of the default"""
+    value = os.environ.get(f"BLOG_{name}")
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    if value.strip().lower() in ('', 'none'):
+        return None
+    return value
 
 class BlogConfig:
-    """Configuration settings for the blog"""
-    MD_FOLDER = os.path.join(os.path.dirname(__file__), "md")
-    HOST = "0.0.0.0"
-    PORT = 5678
-    DEBUG = True
+    """Configuration settings for the blog, overridable with BLOG_* environment variables"""
+    MD_FOLDER = env_setting("MD_FOLDER", os.path.join(os.path.dirname(__file__), "md"))
+    HOST = env_setting("HOST", "0.0.0.0")
+    PORT = env_setting("PORT", 5678)
+    DEBUG = env_setting("DEBUG", True)
+    POST_CACHE_SIZE = env_setting("POST_CACHE_SIZE", 0)  # Entry cap on top of the byte budget, 0 for none
+    POST_CACHE_BYTES = env_setting("POST_CACHE_BYTES", 64 * 1024 * 1024)
+    POST_CACHE_POLICY = env_setting("POST_CACHE_POLICY", "lru")  # 'lru' or 'slru' (frequency-aware)
+    POST_CACHE_VERIFY_HASH = env_setting("POST_CACHE_VERIFY_HASH", False)
+    RENDER_WAIT_TIMEOUT = env_setting("RENDER_WAIT_TIMEOUT", 10.0)  # Seconds to wait for another render of the same post
+    RENDER_CACHE_PATH = env_setting("RENDER_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "render.sqlite3"))
+    RESPONSE_CACHE_SIZE = env_setting("RESPONSE_CACHE_SIZE", 512)
+    COMPRESS_MIN_SIZE = env_setting("COMPRESS_MIN_SIZE", 1024)
+    GZIP_LEVEL = env_setting("GZIP_LEVEL", 6)
+    BROTLI_QUALITY = env_setting("BROTLI_QUALITY", 5)
+    PAGE_SIZE = env_setting("PAGE_SIZE", 100)  # Posts per home/category page, 0 lists everything
+    STREAM_THRESHOLD = env_setting("STREAM_THRESHOLD", 500)  # Stream pages listing more posts, 0 never streams
+    WATCH_MD_FOLDER = env_setting("WATCH_MD_FOLDER", True)
+    WARM_ON_START = env_setting("WARM_ON_START", False)
+    WARM_WORKERS = env_setting("WARM_WORKERS", 0) or None  # Defaults to the CPU count
+    CATALOG_POLL_INTERVAL = env_setting("CATALOG_POLL_INTERVAL", 5.0)
+    CATALOG_POLL = env_setting("CATALOG_POLL", False)  # Always poll; inotify misses host edits on bind mounts and NFS/CIFS
+    PRELOAD_SEARCH_INDEX = env_setting("PRELOAD_SEARCH_INDEX", True)
+    METRICS = env_setting("METRICS", True)  # Stage timing, Server-Timing headers and /metrics
+    SEARCH_PAGE_SIZE = env_setting("SEARCH_PAGE_SIZE", 20)
+    SEARCH_MAX_LIMIT = env_setting("SEARCH_MAX_LIMIT", 100)
+    SEARCH_CONCURRENCY = env_setting("SEARCH_CONCURRENCY", 2)  # Searches run at once per process
+    SEARCH_QUEUE = env_setting("SEARCH_QUEUE", 4)  # Searches that may wait for a slot; more get 503
+    SEARCH_QUEUE_TIMEOUT = env_setting("SEARCH_QUEUE_TIMEOUT", 2.0)  # Seconds a queued search waits for a slot
+    SEARCH_TIME_BUDGET = env_setting("SEARCH_TIME_BUDGET", 0.5)  # Seconds before partial results are returned, 0 for no limit
+    SEARCH_CACHE_SIZE = env_setting("SEARCH_CACHE_SIZE", 256)
+    SEARCH_CACHE_TTL = env_setting("SEARCH_CACHE_TTL", 30.0)  # Seconds a result page is reused for the same query
+    SUGGEST_LIMIT = env_setting("SUGGEST_LIMIT", 8)
+    SUGGEST_MAX_LIMIT = env_setting("SUGGEST_MAX_LIMIT", 20)
+    ASSET_MAX_AGE = env_setting("ASSET_MAX_AGE", 7 * 24 * 3600)  # Seconds browsers reuse an image before revalidating
+    ASSET_CACHE_PATH = env_setting("ASSET_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "assets"))
+    ASSET_WIDTHS = env_setting("ASSET_WIDTHS", "160,320,640,1280")  # Widths ?w= may resize images to
+    THUMBNAIL_WIDTH = env_setting("THUMBNAIL_WIDTH", 160)  # Listing thumbnails of a front matter 'image'
+    SITE_URL = env_setting("SITE_URL", None)  # Base of the absolute links in the feed and sitemap, e.g. https://blog.example.com
+    FEED_TITLE = env_setting("FEED_TITLE", "Blogs")
+    FEED_SIZE = env_setting("FEED_SIZE", 20)  # Newest posts in /feed.xml
+    SITEMAP_SIZE = env_setting("SITEMAP_SIZE", 50000)  # URLs per sitemap file; the protocol allows at most 50,000
     SOCIAL_LINKS = {
         "github": "https://github.com/siddhantdembi",
         "linkedin": "https://linkedin.com/in/siddhantdembi"
@@ -94,6 +190,12 @@ class BlogConfig:
         .post-item:hover { 
             background: #f1f1f1; 
         }
+        .pagination { 
+            display: flex; 
+            justify-content: space-between; 
+            margin: 20px 0; 
+            color: #666; 
+        }
         .category { 
             color: #666; 
             font-size: 0.9em; 
@@ -133,6 +235,14 @@ class BlogConfig:
             align-items: center;
             width: 100%;
         }
+        .post-thumb {
+            width: 64px;
+            height: 64px;
+            object-fit: cover;
+            vertical-align: middle;
+            margin-right: 10px;
+            border-radius: 4px;
+        }
     """
 
 class TemplateRenderer:
@@ -146,15 +256,17 @@ class TemplateRenderer:
         <title>{{ title }}</title>
 <link rel="icon" href="https://www.freeiconspng.com/uploads/notepad-icon-2.png">
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0-beta3/css/all.min.css">
-<style>{{ styles }}</style>
+<link rel="stylesheet" href="{{ stylesheet_url }}">
+<link rel="alternate" type="application/atom+xml" title="Atom feed" href="/feed.xml">
 
     </head>
     <body>
         <div class="navbar">
             <a href="/">Home</a>
             <form action="/search" method="GET" style="flex-grow: 1; margin: 0 20px;">
-                <input type="text" name="q" placeholder="Search posts..." 
+                <input type="text" name="q" placeholder="Search posts..." list="suggestions" autocomplete="off"
                     value="{{ request.args.get('q', '') }}" style="width: 100%; padding: 8px;">
+                <datalist id="suggestions"></datalist>
             </form>
             <div class="social-icons">
                 <a href="{{ social_links.github }}" target="_blank" title="GitHub">
@@ -194,17 +306,219 @@ class TemplateRenderer:
         <footer>
             <p>Blogs by Siddhant Dembi</p>
         </footer>
+        <script>
+            const box = document.querySelector('.navbar input[name="q"]');
+            const list = document.getElementById('suggestions');
+            let urls = {};
+            let timer = null;
+            let latest = 0;
+            box.addEventListener('input', event => {
+                // Picking an option replaces the text (older browsers leave inputType unset); typing never navigates
+                const picked = event.inputType === undefined || event.inputType === 'insertReplacementText';
+                if (picked && urls[box.value]) { window.location = urls[box.value]; return; }
+                clearTimeout(timer);
+                timer = setTimeout(async () => {
+                    const sent = ++latest;
+                    const response = await fetch('/search/suggest?q=' + encodeURIComponent(box.value));
+                    const data = await response.json();
+                    if (sent !== latest) return;  // A newer request went out while this one was in flight
+                    urls = {};
+                    list.replaceChildren(...data.suggestions.map(s => {
+                        urls[s.label] = s.url;
+                        const option = document.createElement('option');
+                        option.value = s.label;
+                        option.label = s.kind;
+                        return option;
+                    }));
+                }, 150);
+            });
+        </script>
     </body>
     </html>
     """
 
+    LISTING_MACROS = """
+    {% macro post_item(item) %}
+        <li class='post-item'>
+            <div class="post-header">
+                <a href="/{{ item.path }}">{% if item.image %}<img class='post-thumb' src="{{ item.image|thumbnail }}" alt="" loading="lazy">{% endif %}{{ item.title }}</a>
+                {% if item.date_str %}<span class='post-date'>{{ item.date_str }}</span>{% endif %}
+            </div>
+        </li>
+    {% endmacro %}
+
+    {% macro pager(pages, newer='Newer posts', older='Older posts') %}
+        {% if pages and (pages.newer or pages.older) %}
+        <div class='pagination'>
+            <span>{% if pages.newer %}<a href="{{ pages.newer }}">&larr; {{ newer }}</a>{% endif %}</span>
+            <span>{{ pages.first }}&ndash;{{ pages.last }} of {{ pages.total }}</span>
+            <span>{% if pages.older %}<a href="{{ pages.older }}">{{ older }} &rarr;</a>{% endif %}</span>
+        </div>
+        {% endif %}
+    {% endmacro %}
+    """
+
+    HOME_TEMPLATE = """{% from 'listing.html' import post_item, pager %}
+    <h1>Home</h1><hr style='margin-top: -20px; margin-bottom: 20px; border: 2px solid #000;'>
+    {% for category_name, posts in groups %}
+        <h2><a href='/category/{{ category_name }}'>{{ 'Uncategorized' if category_name == '_root' else category_name|display_name }}</a></h2>
+        <ul class='post-list'>
+        {% for item in posts %}{{ post_item(item) }}{% endfor %}
+        </ul>
+    {% endfor %}
+    {{ pager(pages) }}
+    """
+
+    CATEGORY_TEMPLATE = """{% from 'listing.html' import post_item, pager %}
+    <h1>{{ category|display_name }}</h1>
+    {% if subcategories %}
+        <h2>Subcategories</h2><ul class='subcategory-list'>
+        {% for sub, count in subcategories %}
+            <li class='post-item'>
+                <a href='/category/{{ sub }}'>{{ sub.split('/')[-1]|display_name }}</a>
+                <span class='category'>({{ count }} post{{ 's' if count != 1 }})</span>
+            </li>
+        {% endfor %}
+        </ul>
+    {% endif %}
+    {% if posts %}
+        <h2>Posts</h2><ul class='post-list'>
+        {% for item in posts %}{{ post_item(item) }}{% endfor %}
+        </ul>
+    {% endif %}
+    {{ pager(pages) }}
+    """
+
+    SEARCH_TEMPLATE = """{% from 'listing.html' import pager %}
+    <h1>Search Results</h1>
+    {% if partial %}
+        <p class='post-meta'>The search ran out of time, so these results may be incomplete.</p>
+    {% endif %}
+    {% if results %}
+        <p>Found {{ total }} matches for "{{ query }}"</p>
+        <ul class='post-list'>
+        {% for result in results %}
+            <li class='post-item'>
+                <a href="/{{ result.path }}">{{ result.title }}</a>
+                <p class='post-meta'>Posted on {{ result.date }} by {{ result.author }}</p>
+                <p>{{ result.excerpt }}</p>
+            </li>
+        {% endfor %}
+        </ul>
+        {{ pager(pages, 'Previous results', 'More results') }}
+    {% else %}
+        <div class="error"><p>No results found for "{{ query }}"</p></div>
+    {% endif %}
+    """
+
+    POST_TEMPLATE = """
+    <h1>{{ title }}</h1>
+    {% if date or author %}
+        <p class='post-meta'>
+            {%- if date %}Posted on {{ date }}{% endif %}
+            {%- if author %}{{ ' by ' if date else 'By ' }}{{ author }}{% endif -%}
+        </p>
+    {% endif %}
+    {{ html|safe }}
+    """
+
+    FEED_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>{{ title }}</title>
+    <id>{{ site_url }}/</id>
+    <link href="{{ site_url }}/"/>
+    <link rel="self" href="{{ site_url }}/feed.xml"/>
+    <updated>{{ updated }}</updated>
+    <author><name>{{ title }}</name></author>
+    {%- for entry in entries %}
+    <entry>
+        <title>{{ entry.title }}</title>
+        <id>{{ site_url }}/{{ entry.path }}</id>
+        <link href="{{ site_url }}/{{ entry.path }}"/>
+        <published>{{ entry.published }}</published>
+        <updated>{{ entry.updated }}</updated>
+    </entry>
+    {%- endfor %}
+</feed>
+"""
+
+    SITEMAP_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{%- for loc, lastmod in urls %}
+<url><loc>{{ site_url }}{{ loc }}</loc>{% if lastmod %}<lastmod>{{ lastmod }}</lastmod>{% endif %}</url>
+{%- endfor %}
+</urlset>
+"""
+
+    SITEMAP_INDEX_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{%- for loc, lastmod in sitemaps %}
+<sitemap><loc>{{ site_url }}{{ loc }}</loc>{% if lastmod %}<lastmod>{{ lastmod }}</lastmod>{% endif %}</sitemap>
+{%- endfor %}
+</sitemapindex>
+"""
+
+    STREAM_BUFFER = 64  # Template chunks joined per streamed write
+
+    _env = None
+    stylesheet = None
+    stylesheet_version = None
+    stylesheet_variants = {}
+    version = None
+
+    @classmethod
+    def init_app(cls, app):
+        """Compile every template once and fingerprint the stylesheet"""
+        cls._env = app.jinja_env.overlay(loader=DictLoader({
+            'base.html': cls.BASE_TEMPLATE,
+            'listing.html': cls.LISTING_MACROS,
+            'home.html': cls.HOME_TEMPLATE,
+            'category.html': cls.CATEGORY_TEMPLATE,
+            'search.html': cls.SEARCH_TEMPLATE,
+            'post.html': cls.POST_TEMPLATE,
+            'feed.xml': cls.FEED_TEMPLATE,
+            'sitemap.xml': cls.SITEMAP_TEMPLATE,
+            'sitemap-index.xml': cls.SITEMAP_INDEX_TEMPLATE,
+        }))
+        cls._env.filters['display_name'] = display_name
+        cls._env.filters['thumbnail'] = thumbnail_url
+        cls._templates = {name: cls._env.get_template(name) for name in cls._env.list_templates()}
+        cls.stylesheet = BlogConfig.STYLES.encode('utf-8')
+        cls.stylesheet_version = hashlib.sha256(cls.stylesheet).hexdigest()[:16]
+        cls.stylesheet_variants = {}
+        sources = ''.join(cls._env.loader.mapping[name] for name in sorted(cls._templates))
+        # Thumbnail URLs carry the width, so changing it has to re-render listings too
+        inputs = f"{sources}{cls.stylesheet_version}:{BlogConfig.THUMBNAIL_WIDTH}"
+        cls.version = hashlib.sha256(inputs.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def render(cls, name, **context):
+        """Render one of the compiled templates"""
+        return cls._templates[name].render(**context)
+
+    @classmethod
+    def stream_page(cls, title, name, breadcrumbs=None, **context):
+        """Yield a full page in chunks, sending the navbar before the listing is rendered"""
+        marker = '<!--content-->'
+        head, tail = cls.render_page(title, marker, breadcrumbs).split(marker, 1)
+        yield head
+        yield from cls.stream(name, **context)
+        yield tail
+
+    @classmethod
+    def stream(cls, name, **context):
+        """Yield one of the compiled templates in buffered chunks"""
+        stream = cls._templates[name].stream(**context)
+        stream.enable_buffering(cls.STREAM_BUFFER)
+        yield from stream
+
     @classmethod
     def render_page(cls, title, content, breadcrumbs=None, error=None):
         """Render a page with common layout"""
-        return render_template_string(
-            cls.BASE_TEMPLATE,
+        return cls.render(
+            'base.html',
             title=title,
-            styles=BlogConfig.STYLES,
+            stylesheet_url=f"/assets/style.{cls.stylesheet_version}.css",
             social_links=BlogConfig.SOCIAL_LINKS,
             content=content,
             breadcrumbs=breadcrumbs,
@@ -212,97 +526,2106 @@ class TemplateRenderer:
             request=request
         )
 
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers for that key share its result"""
+    def __init__(self, timeout=10.0):
+        self.timeout = timeout
+        self._calls = {}  # key -> [done event, result, failed]
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0  # Callers served by another caller's result
+        self.timeouts = 0   # Callers that gave up waiting and ran the call themselves
+
+    def do(self, key, func):
+        """Return func(), or the result of the call already running for key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, True]
+                self.calls += 1
+
+        if leader:
+            try:
+                call[1] = func()
+                call[2] = False
+                return call[1]
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call[0].set()
+
+        if not call[0].wait(self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            return func()
+        if call[2]:
+            return func()  # The leader raised; let this caller see its own error
+        with self._lock:
+            self.coalesced += 1
+        return call[1]
+
+    def stats(self):
+        """Return call/coalesced/timeout counters"""
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced,
+                    'timeouts': self.timeouts, 'in_flight': len(self._calls)}
+
+class LRUPolicy:
+    """Evict the least recently used entry"""
+    name = 'lru'
+
+    def __init__(self, max_bytes=0):
+        self._order = OrderedDict()  # key -> size, least recent first
+
+    def add(self, key, size):
+        self._order[key] = size
+        self._order.move_to_end(key)
+
+    def hit(self, key):
+        self._order.move_to_end(key)
+
+    def remove(self, key):
+        self._order.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._order))
+
+class SegmentedLRUPolicy:
+    """Frequency-aware LRU: entries hit again move to a protected segment, so posts
+    read once (a crawler, a cache warm-up) are evicted before frequently read ones"""
+    name = 'slru'
+    PROTECTED_SHARE = 0.8
+
+    def __init__(self, max_bytes=0):
+        self._probation = OrderedDict()  # key -> size, least recent first
+        self._protected = OrderedDict()
+        self._protected_bytes = 0
+        self._protected_limit = max_bytes * self.PROTECTED_SHARE
+
+    def add(self, key, size):
+        self.remove(key)
+        self._probation[key] = size
+
+    def hit(self, key):
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return
+        size = self._probation.pop(key)
+        self._protected[key] = size
+        self._protected_bytes += size
+        # Demote the coldest protected entries back to probation
+        while self._protected_limit and self._protected_bytes > self._protected_limit and len(self._protected) > 1:
+            demoted, demoted_size = self._protected.popitem(last=False)
+            self._protected_bytes -= demoted_size
+            self._probation[demoted] = demoted_size
+
+    def remove(self, key):
+        self._probation.pop(key, None)
+        size = self._protected.pop(key, None)
+        if size is not None:
+            self._protected_bytes -= size
+
+    def victim(self):
+        return next(iter(self._probation or self._protected))
+
+EVICTION_POLICIES = {policy.name: policy for policy in (LRUPolicy, SegmentedLRUPolicy)}
+
+def approximate_size(value):
+    """Rough number of bytes held by a cached value and everything it contains"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+class PostCache:
+    """Cache of loaded posts, validated against each source file's stat
+
+    Bounded by a byte budget measured over each post's HTML, text and metadata,
+    and optionally by entry count; the eviction policy is pluggable.
+    """
+    _MISSING = object()
+
+    def __init__(self, maxsize=0, verify_hash=False, load_timeout=10.0, max_bytes=0, policy='lru'):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown cache eviction policy: {policy}")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.policy = EVICTION_POLICIES[policy](max_bytes)
+        self._entries = {}  # key -> (signature, digest, value, size)
+        self._lock = threading.Lock()
+        # Concurrent misses for the same file version load it once
+        self.loads = SingleFlight(load_timeout)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.rejected = 0  # Values larger than the whole budget, never stored
+
+    @staticmethod
+    def file_digest(file_path):
+        """Hash a file's contents"""
+        with open(file_path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def get(self, key, file_path, loader):
+        """Return the cached value for key, calling loader() if the file changed"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.invalidate(key)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                if entry[0] == signature:
+                    self.policy.hit(key)
+                    self.hits += 1
+                    return entry[2]
+
+        digest = None
+        if entry is not self._MISSING:
+            if self.verify_hash and entry[1] is not None:
+                # Touched but unchanged files keep their rendered value
+                digest = self.file_digest(file_path)
+                if digest == entry[1]:
+                    with self._lock:
+                        self._store(key, signature, digest, entry[2], entry[3])
+                        self.hits += 1
+                    return entry[2]
+            with self._lock:
+                self.stale += 1
+        else:
+            with self._lock:
+                self.misses += 1
+
+        return self.loads.do((key, signature), lambda: self._load(key, signature, digest, file_path, loader))
+
+    def _load(self, key, signature, digest, file_path, loader):
+        if self.verify_hash and digest is None:
+            digest = self.file_digest(file_path)
+        value = loader()
+        size = approximate_size(value)
+        with self._lock:
+            self._store(key, signature, digest, value, size)
+        return value
+
+    def put(self, key, signature, value, digest=None):
+        """Seed an entry for a file whose (mtime_ns, size) signature is known"""
+        size = approximate_size(value)
+        with self._lock:
+            self._store(key, signature, digest, value, size)
+
+    def _store(self, key, signature, digest, value, size):
+        self._discard(key)
+        if self.max_bytes and size > self.max_bytes:
+            self.rejected += 1
+            return
+        self._entries[key] = (signature, digest, value, size)
+        self.bytes += size
+        self.policy.add(key, size)
+        while (self.maxsize and len(self._entries) > self.maxsize) or (self.max_bytes and self.bytes > self.max_bytes):
+            self._discard(self.policy.victim())
+            self.evictions += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+            self.policy.remove(key)
+
+    def invalidate(self, key):
+        """Forget a single entry"""
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        """Forget every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.policy = type(self.policy)(self.max_bytes)
+
+    def stats(self):
+        """Return hit/miss/stale counters"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'occupancy': self.bytes / self.max_bytes if self.max_bytes else 0.0,
+                'policy': self.policy.name,
+                'evictions': self.evictions,
+                'rejected': self.rejected,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'loads': self.loads.stats(),
+            }
+
+class AdmissionLimiter:
+    """Bounds concurrent calls, letting a few more wait for a slot and turning the rest away
+
+    Admitted calls also get a time budget; callers that run out of it report
+    back through finished(partial=True).
+    """
+    def __init__(self, concurrency, queue=0, timeout=1.0, budget=0):
+        self.queue = queue
+        self.timeout = timeout
+        self.budget = budget
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0  # Calls refused because the queue was full or the wait timed out
+        self.partial = 0   # Admitted calls that ran out of budget
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if there is room; False means the caller should back off"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.waiting >= self.queue:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+            try:
+                admitted = self._slots.acquire(timeout=self.timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not admitted:
+                with self._lock:
+                    self.rejected += 1
+                return False
+        with self._lock:
+            self.admitted += 1
+        return True
+
+    def deadline(self):
+        """Return the time.perf_counter() value an admitted call should finish by, or None"""
+        return time.perf_counter() + self.budget if self.budget else None
+
+    def release(self, partial=False):
+        self._slots.release()
+        if partial:
+            with self._lock:
+                self.partial += 1
+
+    def stats(self):
+        """Return admitted/rejected/partial counters and the current queue length"""
+        with self._lock:
+            return {'admitted': self.admitted, 'rejected': self.rejected, 'partial': self.partial,
+                    'waiting': self.waiting}
+
+class TTLCache:
+    """Small LRU cache whose entries expire a fixed number of seconds after they are stored"""
+    def __init__(self, maxsize=256, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expiry time, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the value stored for key, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if not self.ttl or not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters"""
+        with self._lock:
+            return {'entries': len(self._entries), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                    'hits': self.hits, 'misses': self.misses}
+
+class ResponseCache:
+    """Rendered page bodies keyed by route, valid while their ETag matches"""
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (etag, body bytes, {encoding: compressed body})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, etag):
+        """Return the cached (etag, body, variants) entry for key if it was rendered for this ETag"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, etag, body):
+        """Store a rendered body, evicting the least recently used pages"""
+        entry = (etag, body, {})
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while self.maxsize and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        """Return hit/miss/304 counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+            }
+
+class AssetStore:
+    """Images and attachments kept next to the posts, with content hashes and resized variants"""
+    SEGMENT_RE = re.compile(r'^[A-Za-z0-9_\-][A-Za-z0-9_.\-]*$')
+    RESIZABLE = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WEBP'}
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, md_folder, cache_dir=None, widths=None):
+        self.md_folder = os.path.realpath(md_folder)
+        self.cache_dir = cache_dir
+        self.widths = frozenset(int(w) for w in (widths or '').split(',') if w.strip())
+        self._digests = {}  # file path -> ((mtime_ns, size), sha1 of the contents)
+        self._lock = threading.Lock()
+        self.resizes = SingleFlight()
+        self.hashed = 0
+        self.resized = 0
+
+    def resolve(self, path):
+        """Return (file path, stat) for an asset under the md folder, or None
+
+        Markdown sources, hidden files and symlinks leading out of the folder
+        are never served.
+        """
+        parts = path.split('/')
+        if path.lower().endswith('.md') or not all(self.SEGMENT_RE.match(part) for part in parts):
+            return None
+        file_path = os.path.realpath(os.path.join(self.md_folder, *parts))
+        if not file_path.startswith(self.md_folder + os.sep):
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return file_path, st
+
+    def digest(self, file_path, st):
+        """Return the content hash of a file, rehashing only when its mtime or size changes"""
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._digests.get(file_path)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+        sha1 = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        with self._lock:
+            self._digests[file_path] = (signature, digest)
+            self.hashed += 1
+        return digest
+
+    def variant(self, file_path, digest, width):
+        """Return the path of an image resized to width, or None to serve the original
+
+        Variants are written to the cache directory under the source's content
+        hash, so an edited image never reuses an old variant.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if Image is None or not self.cache_dir or width not in self.widths or extension not in self.RESIZABLE:
+            return None
+        target = os.path.join(self.cache_dir, f"{digest}-{width}{extension}")
+        if os.path.isfile(target):
+            return target
+        return self.resizes.do(target, lambda: self._resize(file_path, target, width, self.RESIZABLE[extension]))
+
+    def _resize(self, file_path, target, width, image_format):
+        if os.path.isfile(target):
+            return target  # Written by another worker process meanwhile
+        try:
+            with Image.open(file_path) as source:
+                image = ImageOps.exif_transpose(source)
+                if image.width <= width:
+                    return None
+                image.thumbnail((width, image.height))
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+                image.save(tmp_path, image_format, optimize=True, quality=85)
+            os.replace(tmp_path, target)
+        except Exception as e:
+            logging.error(f"Error resizing {file_path} to {width}px: {str(e)}")
+            return None
+        with self._lock:
+            self.resized += 1
+        return target
+
+    def stats(self):
+        """Return hashing and resizing counters"""
+        with self._lock:
+            return {'hashed': self.hashed, 'resized': self.resized,
+                    'coalesced': self.resizes.stats()['coalesced']}
+
+class Metrics:
+    """Stage timings, per-route latency histograms and Prometheus text output"""
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self):
+        self.stages = {}  # stage -> [calls, seconds]
+        self.routes = {}  # route -> [count per bucket..., +Inf count, seconds]
+        self._lock = threading.Lock()
+
+    def instrument(self, owner, name, stage):
+        """Replace owner.name with a wrapper that records its run time under stage"""
+        func = inspect.getattr_static(owner, name)
+        if isinstance(func, (classmethod, staticmethod)):
+            setattr(owner, name, type(func)(self.timed(stage, func.__func__)))
+        else:
+            setattr(owner, name, self.timed(stage, func))
+
+    def timed(self, stage, func):
+        """Wrap func so its run time is recorded; generators are timed per item produced"""
+        record = self.record
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def generator(*args, **kwargs):
+                items = func(*args, **kwargs)
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        record(stage, time.perf_counter() - started)
+                        return
+                    record(stage, time.perf_counter() - started)
+                    yield item
+            return generator
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - started)
+        return wrapper
+
+    def record(self, stage, seconds):
+        """Add time spent in a stage to the totals and to the current request"""
+        with self._lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += seconds
+        if has_request_context():
+            timings = g.setdefault('stage_timings', {})
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def observe(self, route, seconds):
+        """Count one request of a route in its latency histogram"""
+        i = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            histogram = self.routes.get(route)
+            if histogram is None:
+                histogram = self.routes[route] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            histogram[i] += 1
+            histogram[-1] += seconds
+
+    @staticmethod
+    def server_timing(timings, total):
+        """Format stage timings as a Server-Timing header value"""
+        parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ', '.join(parts)
+
+    def render(self, counters, gauges):
+        """Return every metric in the Prometheus text exposition format
+
+        counters and gauges map a metric name to (help, {label string: value}).
+        """
+        lines = [
+            '# HELP blog_request_duration_seconds Request latency by route',
+            '# TYPE blog_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            for route, histogram in sorted(self.routes.items()):
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS + ('+Inf',), histogram):
+                    cumulative += count
+                    lines.append(f'blog_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+                lines.append(f'blog_request_duration_seconds_sum{{route="{route}"}} {histogram[-1]:.6f}')
+                lines.append(f'blog_request_duration_seconds_count{{route="{route}"}} {cumulative}')
+            stages = {stage: list(totals) for stage, totals in self.stages.items()}
+
+        counters = dict(counters)
+        counters['blog_stage_seconds_total'] = (
+            'Time spent in each processing stage',
+            {f'stage="{stage}"': seconds for stage, (_, seconds) in stages.items()})
+        counters['blog_stage_calls_total'] = (
+            'Calls of each processing stage',
+            {f'stage="{stage}"': calls for stage, (calls, _) in stages.items()})
+        for kind, metrics in (('counter', counters), ('gauge', gauges)):
+            for name, (description, samples) in sorted(metrics.items()):
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(samples.items()):
+                    lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+class RenderStore:
+    """SQLite-backed store of rendered posts that survives restarts"""
+    # Bump when rendering changes so older stored output is never served
+    RENDER_VERSION = 3
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = None
+        self._inherited = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Renders skipped because another process was already rendering
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "path TEXT PRIMARY KEY, digest TEXT NOT NULL, version INTEGER NOT NULL, "
+                "html TEXT NOT NULL, metadata BLOB NOT NULL, text TEXT NOT NULL)"
+            )
+            # A lease marks a post version some process is rendering right now
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "path TEXT NOT NULL, digest TEXT NOT NULL, pid INTEGER NOT NULL, expires REAL NOT NULL, "
+                "PRIMARY KEY (path, digest))"
+            )
+
+    def _connection(self):
+        """Return this process's connection; worker processes share the database file"""
+        if self._pid != os.getpid():
+            # Connections must not be reused across fork, so each worker opens its own.
+            # The inherited one is kept referenced, never closed, so the parent's locks stay intact.
+            self._inherited = self._conn
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, path, digest):
+        """Return the stored render for path if it was made from this source digest"""
+        post = self._fetch(path, digest)
+        with self._lock:
+            if post is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return post
+
+    def _fetch(self, path, digest):
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT html, metadata, text FROM posts WHERE path = ? AND digest = ? AND version = ?",
+                    (path, digest, self.RENDER_VERSION)
+                ).fetchone()
+            if row is None:
+                return None
+            return {'html': row[0], 'metadata': pickle.loads(row[1]), 'text': row[2]}
+        except (sqlite3.Error, pickle.UnpicklingError) as e:
+            logging.error(f"Render cache read failed for {path}: {str(e)}")
+            return None
+
+    def claim(self, path, digest, timeout):
+        """Take the lease on rendering a post version, False if another process holds it"""
+        now = time.time()
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute("DELETE FROM leases WHERE path = ? AND digest = ? AND expires < ?", (path, digest, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO leases (path, digest, pid, expires) VALUES (?, ?, ?, ?)",
+                    (path, digest, os.getpid(), now + timeout)
+                )
+                return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logging.error(f"Render lease failed for {path}: {str(e)}")
+            return True
+
+    def release(self, path, digest):
+        """Give up a lease taken with claim()"""
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute("DELETE FROM leases WHERE path = ? AND digest = ? AND pid = ?",
+                             (path, digest, os.getpid()))
+        except sqlite3.Error as e:
+            logging.error(f"Render lease release failed for {path}: {str(e)}")
+
+    def wait(self, path, digest, timeout, interval=0.02):
+        """Poll for a render another process holds the lease on, None after timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            post = self._fetch(path, digest)
+            if post is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return post
+            interval = min(interval * 2, 0.2)
+        return None
+
+    def put(self, path, digest, post):
+        """Store a freshly rendered post, replacing any older version"""
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO posts (path, digest, version, html, metadata, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, digest, self.RENDER_VERSION, post['html'],
+                     pickle.dumps(post['metadata']), post['text'])
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Render cache write failed for {path}: {str(e)}")
+
+    def digests(self):
+        """Return {path: source digest} for every entry made by the current renderer"""
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT path, digest FROM posts WHERE version = ?", (self.RENDER_VERSION,)
+                ).fetchall()
+            return dict(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Render cache read failed: {str(e)}")
+            return {}
+
+    def delete(self, path):
+        """Drop the stored render for a removed post"""
+        try:
+            with self._lock, self._connection() as conn:
+                conn.execute("DELETE FROM posts WHERE path = ?", (path,))
+        except sqlite3.Error as e:
+            logging.error(f"Render cache delete failed for {path}: {str(e)}")
+
+    def stats(self):
+        """Return hit/miss counters"""
+        return {'path': self.db_path, 'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
+
+class PostCatalog:
+    """In-process catalog of markdown posts, updated incrementally as files change"""
+    def __init__(self, md_folder):
+        self.md_folder = os.path.abspath(md_folder)
+        self._entries = {}  # post path -> (mtime_ns, size)
+        self._sorted = None
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._watcher = None
+        self.version = 0
+
+    def add_listener(self, listener):
+        """Call listener(path, signature) for every change; signature is None on removal"""
+        self._listeners.append(listener)
+
+    def post_path(self, full_path):
+        """Map a markdown file to its post path, or None if it is not a post"""
+        if not full_path.endswith('.md'):
+            return None
+        relative_path = os.path.relpath(full_path, self.md_folder)
+        if relative_path.startswith('..'):
+            return None
+        return relative_path[:-3].replace("\\", "/")
+
+    def _walk(self, top):
+        """Yield (post path, signature) for every non-empty post under top"""
+        for root, dirs, files in os.walk(top):
+            for file in files:
+                if not file.endswith(".md"):
+                    continue
+                full_path = os.path.join(root, file)
+                try:
+                    st = os.stat(full_path)
+                except OSError:
+                    continue
+                if st.st_size == 0:
+                    continue  # Skip empty files
+                yield self.post_path(full_path), (st.st_mtime_ns, st.st_size)
+
+    def _set(self, path, signature):
+        if self._entries.get(path) == signature:
+            return
+        if signature is None:
+            if path not in self._entries:
+                return
+            del self._entries[path]
+        else:
+            self._entries[path] = signature
+        self._sorted = None
+        self.version += 1
+        for listener in self._listeners:
+            listener(path, signature)
+
+    def scan(self):
+        """Walk the md folder and reconcile the catalog with it"""
+        self.refresh_tree(self.md_folder)
+
+    def refresh_tree(self, top):
+        """Reconcile every entry under a directory with what is on disk"""
+        top = os.path.abspath(top)
+        relative_top = os.path.relpath(top, self.md_folder)
+        if relative_top.startswith('..'):
+            return
+        prefix = '' if relative_top == '.' else relative_top.replace("\\", "/") + '/'
+        found = dict(self._walk(top)) if os.path.isdir(top) else {}
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix) and p not in found]:
+                self._set(path, None)
+            for path, signature in found.items():
+                self._set(path, signature)
+
+    def refresh_file(self, full_path):
+        """Update the entry for a single markdown file"""
+        path = self.post_path(os.path.abspath(full_path))
+        if path is None:
+            return
+        try:
+            st = os.stat(full_path)
+            signature = (st.st_mtime_ns, st.st_size) if st.st_size else None
+        except OSError:
+            signature = None
+        with self._lock:
+            self._set(path, signature)
+
+    def posts(self):
+        """Return every post path, sorted alphabetically"""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = tuple(sorted(self._entries, key=str.lower))
+            return self._sorted
+
+    def signature(self, path):
+        """Return the (mtime_ns, size) recorded for a post"""
+        return self._entries.get(path)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def start_watching(self, poll_interval=BlogConfig.CATALOG_POLL_INTERVAL, poll=BlogConfig.CATALOG_POLL):
+        """Keep the catalog current with inotify, or by polling where that is unavailable or poll is set"""
+        if self._watcher is not None:
+            return self._watcher
+        if Observer is not None and not poll:
+            try:
+                observer = Observer()
+                observer.daemon = True
+                observer.schedule(_CatalogEventHandler(self), self.md_folder, recursive=True)
+                observer.start()
+                self._watcher = observer
+                return observer
+            except OSError as e:
+                logging.warning(f"Filesystem events unavailable for {self.md_folder}, polling instead: {str(e)}")
+        self._watcher = _CatalogPoller(self, poll_interval)
+        self._watcher.start()
+        return self._watcher
+
+    def after_fork(self, poll_interval=BlogConfig.CATALOG_POLL_INTERVAL, poll=BlogConfig.CATALOG_POLL):
+        """Rescan md/ in a forked worker and start its watcher, with a lock of its own
+
+        A worker respawned long after startup inherits the catalog the master
+        loaded, so changes made since then are picked up before watching.
+        """
+        self._lock = threading.RLock()
+        self._watcher = None
+        self.scan()
+        return self.start_watching(poll_interval, poll)
+
+    def stop_watching(self):
+        """Stop the background watcher"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+class _CatalogEventHandler(FileSystemEventHandler):
+    """Translates watchdog events into catalog updates"""
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def _refresh(self, path, is_directory):
+        if is_directory:
+            self.catalog.refresh_tree(path)
+        else:
+            self.catalog.refresh_file(path)
+
+    def on_created(self, event):
+        self._refresh(event.src_path, event.is_directory)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.catalog.refresh_file(event.src_path)
+
+    def on_deleted(self, event):
+        self._refresh(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        self._refresh(event.src_path, event.is_directory)
+        self._refresh(event.dest_path, event.is_directory)
+
+class _CatalogPoller(threading.Thread):
+    """Periodically rescans the md folder for mounts without inotify support"""
+    def __init__(self, catalog, interval):
+        super().__init__(daemon=True, name="catalog-poller")
+        self.catalog = catalog
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.catalog.scan()
+            except Exception as e:
+                logging.error(f"Catalog rescan failed: {str(e)}")
+
+    def stop(self):
+        self._stopped.set()
+
+class CategoryNode:
+    """A folder in the category tree"""
+    __slots__ = ('name', 'path', 'depth', 'children', 'posts', 'recursive',
+                 'direct_count', 'count', 'digest', 'last_modified')
+
+    def __init__(self, name, path, depth):
+        self.name = sys.intern(name)
+        self.path = path
+        self.depth = depth
+        self.children = {}
+        self.posts = array('I')      # Direct posts as catalog slots, newest first
+        self.recursive = array('I')  # All posts below a top-level category, newest first
+        self.direct_count = 0
+        self.count = 0
+        self.digest = 0            # XOR of the version hashes of every post below
+        self.last_modified = 0.0   # Newest file mtime or membership change below
+
+    def subcategories(self):
+        """Return (path, recursive post count) for each child, sorted by path"""
+        return [(child.path, child.count) for _, child in sorted(self.children.items())]
+
+class ListedPost:
+    """One row of a post listing"""
+    __slots__ = ('path', 'title', 'date_str', 'image')
+
+    def __init__(self, path, title, date_str, image=None):
+        self.path = path
+        self.title = title
+        self.date_str = date_str
+        self.image = image
+
+class CategoryIndex:
+    """Category trie with newest-first post lists and recursive counts
+
+    Posts live in parallel arrays indexed by a slot number, so a listing entry
+    costs four bytes and sort orders are arrays of slots rather than lists of
+    tuples. Dates are stored as integer microseconds since 0001-01-01.
+    """
+    UNDATED = -1
+
+    def __init__(self):
+        self.root = CategoryNode('', '', 0)
+        self._slots = {}            # post path -> slot
+        self._paths = []            # slot -> post path, None once freed
+        self._titles = []           # slot -> title, None for posts that cannot be listed
+        self._dates = []            # slot -> date as written in the front matter
+        self._images = []           # slot -> listing image URL, or None
+        self._stamps = array('q')   # slot -> microseconds since datetime.min, or UNDATED
+        self._hashes = array('Q')   # slot -> version hash
+        self._free = []
+        self.by_path = array('I')   # Listable slots sorted by path
+        self.by_date = array('I')   # Listable slots in listing order, newest first
+        self._lock = threading.RLock()
+
+    @classmethod
+    def timestamp(cls, date_obj):
+        """Integer microseconds since datetime.min, or UNDATED"""
+        if date_obj is None:
+            return cls.UNDATED
+        return (date_obj - datetime.min) // timedelta(microseconds=1)
+
+    def sort_key(self, slot):
+        """Undated posts first, then newest first, ties alphabetical by path"""
+        stamp = self._stamps[slot]
+        return (stamp != self.UNDATED, -stamp, self._paths[slot].lower())
+
+    def path_key(self, slot):
+        return self._paths[slot]
+
+    @staticmethod
+    def _bisect(entries, key, keyfunc):
+        """bisect_left over a slot array ordered by keyfunc"""
+        lo, hi = 0, len(entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keyfunc(entries[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _insert(self, entries, slot, keyfunc):
+        entries.insert(self._bisect(entries, keyfunc(slot), keyfunc), slot)
+
+    def _discard(self, entries, slot, keyfunc):
+        i = self._bisect(entries, keyfunc(slot), keyfunc)
+        if i < len(entries) and entries[i] == slot:
+            del entries[i]
+
+    @staticmethod
+    def version_hash(path, signature):
+        """Stable 64-bit hash of one post version, identical across processes"""
+        digest = hashlib.sha1(f"{path}:{signature}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def add(self, path, meta, signature=None, changed_at=None):
+        """Insert or update a post; meta may be None for posts that cannot be listed"""
+        with self._lock:
+            self._unlink(path)
+            version = self.version_hash(path, signature)
+            touched = max(signature[0] / 1e9 if signature else 0.0, changed_at or 0.0)
+            fields = (path, meta['title'] if meta else None, meta['date_str'] if meta else '',
+                      meta.get('image') if meta else None)
+            stamp = self.timestamp(meta['date_obj']) if meta else self.UNDATED
+            if self._free:
+                slot = self._free.pop()
+                self._paths[slot], self._titles[slot], self._dates[slot], self._images[slot] = fields
+                self._stamps[slot] = stamp
+                self._hashes[slot] = version
+            else:
+                slot = len(self._paths)
+                self._paths.append(fields[0])
+                self._titles.append(fields[1])
+                self._dates.append(fields[2])
+                self._images.append(fields[3])
+                self._stamps.append(stamp)
+                self._hashes.append(version)
+            self._slots[path] = slot
+
+            node = self.root
+            nodes = [node]
+            for part in path.split('/')[:-1]:
+                child = node.children.get(part)
+                if child is None:
+                    child_path = f"{node.path}/{part}" if node.path else part
+                    child = node.children[part] = CategoryNode(part, child_path, node.depth + 1)
+                node = child
+                nodes.append(node)
+
+            for node in nodes:
+                node.count += 1
+                node.digest ^= version
+                node.last_modified = max(node.last_modified, touched)
+            node.direct_count += 1
+            if meta:
+                self._insert(node.posts, slot, self.sort_key)
+                if len(nodes) > 1:
+                    self._insert(nodes[1].recursive, slot, self.sort_key)
+                self._insert(self.by_date, slot, self.sort_key)
+                self._insert(self.by_path, slot, self.path_key)
+
+    def remove(self, path, changed_at=None):
+        """Drop a post, pruning categories left empty"""
+        with self._lock:
+            for node in self._unlink(path):
+                node.last_modified = max(node.last_modified, changed_at or 0.0)
+
+    def _unlink(self, path):
+        """Remove a post from every node on its path, returning the nodes that remain"""
+        slot = self._slots.pop(path, None)
+        if slot is None:
+            return []
+        version = self._hashes[slot]
+
+        nodes = [self.root]
+        for part in path.split('/')[:-1]:
+            nodes.append(nodes[-1].children[part])
+        for node in nodes:
+            node.count -= 1
+            node.digest ^= version
+        nodes[-1].direct_count -= 1
+        if self._titles[slot] is not None:
+            self._discard(nodes[-1].posts, slot, self.sort_key)
+            if len(nodes) > 1:
+                self._discard(nodes[1].recursive, slot, self.sort_key)
+            self._discard(self.by_date, slot, self.sort_key)
+            self._discard(self.by_path, slot, self.path_key)
+
+        self._paths[slot] = self._titles[slot] = self._images[slot] = None
+        self._dates[slot] = ''
+        self._free.append(slot)
+
+        for i in range(len(nodes) - 1, 0, -1):
+            if nodes[i].count == 0:
+                del nodes[i - 1].children[nodes[i].name]
+                nodes.pop()
+        return nodes
+
+    def node(self, category):
+        """Return the node for a category path, or None if it has no posts"""
+        node = self.root
+        for part in category.split('/'):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def listing(self, entries):
+        """Turn catalog slots into listing rows"""
+        with self._lock:
+            return [ListedPost(self._paths[slot], self._titles[slot], self._dates[slot], self._images[slot])
+                    for slot in entries]
+
+    def newest(self, count):
+        """Return (listing row, publication datetime) for the newest dated posts"""
+        with self._lock:
+            # by_date lists undated posts first, then dated posts newest first
+            start = self._bisect(self.by_date, True, lambda slot: self._stamps[slot] != self.UNDATED)
+            slots = self.by_date[start:start + count]
+            published = [datetime.min + timedelta(microseconds=self._stamps[slot]) for slot in slots]
+            return list(zip(self.listing(slots), published))
+
+    def paths(self):
+        """Return the path of every listable post, sorted"""
+        with self._lock:
+            return [self._paths[slot] for slot in self.by_path]
+
+    def categories(self):
+        """Return (category path, last modified timestamp) for every category, sorted by path"""
+        with self._lock:
+            found = []
+            nodes = list(self.root.children.values())
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.children.values())
+                found.append((node.path, node.last_modified))
+            return sorted(found)
+
+    def category(self, category):
+        """Return (subcategories, direct post items) for a category page"""
+        return self.category_page(category)[:2]
+
+    def home_groups(self):
+        """Return (top-level name, post items) pairs, with root posts under '_root'"""
+        return self.home_page()[0]
+
+    def _cursor(self, entries, path):
+        """Return the index just past path in a sorted slot array"""
+        slot = self._slots.get(path)
+        if slot is None or self._titles[slot] is None:
+            raise KeyError(path)
+        i = self._bisect(entries, self.sort_key(slot), self.sort_key)
+        if i == len(entries) or entries[i] != slot:
+            raise KeyError(path)
+        return i + 1
+
+    def category_page(self, category, offset=0, limit=None, after=None):
+        """Return (subcategories, post items, offset, total) for one page of a category
+
+        Pages are cut from the node's sorted post list; after is the path of the
+        last post on the previous page and takes precedence over offset.
+        """
+        with self._lock:
+            node = self.node(category)
+            if node is None:
+                return [], [], 0, 0
+            if after is not None:
+                offset = self._cursor(node.posts, after)
+            end = None if limit is None else offset + limit
+            return node.subcategories(), self.listing(node.posts[offset:end]), offset, len(node.posts)
+
+    def home_page(self, offset=0, limit=None, after=None):
+        """Return (groups, offset, total) for one page of the grouped home listing
+
+        The home page lists every top-level group in name order, so a page is a
+        window over the groups' sorted post lists laid end to end.
+        """
+        with self._lock:
+            sources = [(name, child.recursive) for name, child in self.root.children.items()]
+            if self.root.direct_count:
+                sources.append(('_root', self.root.posts))
+            sources.sort(key=lambda source: source[0])
+            total = sum(len(entries) for _, entries in sources)
+
+            if after is not None:
+                group = after.split('/', 1)[0] if '/' in after else '_root'
+                start = 0
+                for name, entries in sources:
+                    if name == group:
+                        offset = start + self._cursor(entries, after)
+                        break
+                    start += len(entries)
+                else:
+                    raise KeyError(after)
+            end = total if limit is None else min(offset + limit, total)
+
+            groups = []
+            start = 0
+            for name, entries in sources:
+                stop = start + len(entries)
+                # Groups without listable posts keep their heading on the page they fall on
+                if (start < end and stop > offset) or (not entries and offset <= start and (start < end or end == total)):
+                    groups.append((name, self.listing(entries[max(offset - start, 0):end - start])))
+                start = stop
+            return groups, offset, total
+
 class BlogManager:
     """Handles blog post operations with metadata support"""
-    def __init__(self, md_folder):
+    def __init__(self, md_folder, cache_size=BlogConfig.POST_CACHE_SIZE,
+                 cache_bytes=BlogConfig.POST_CACHE_BYTES, cache_policy=BlogConfig.POST_CACHE_POLICY,
+                 verify_hash=BlogConfig.POST_CACHE_VERIFY_HASH,
+                 render_cache_path=BlogConfig.RENDER_CACHE_PATH,
+                 asset_cache_path=BlogConfig.ASSET_CACHE_PATH):
         self.md_folder = md_folder
         os.makedirs(self.md_folder, exist_ok=True)
+        self.render_store = RenderStore(render_cache_path) if render_cache_path else None
+        self.assets = AssetStore(self.md_folder, asset_cache_path, BlogConfig.ASSET_WIDTHS)
+        self.post_cache = PostCache(maxsize=cache_size, verify_hash=verify_hash,
+                                    load_timeout=BlogConfig.RENDER_WAIT_TIMEOUT,
+                                    max_bytes=cache_bytes, policy=cache_policy)
+        # Front matter is only read when a post changes, so loads are coalesced but not kept
+        self.metadata_loads = SingleFlight(BlogConfig.RENDER_WAIT_TIMEOUT)
+        self.search_index = SearchIndex()
+        self._unindexed = set()
+        self._index_lock = threading.Lock()
+        self.categories = CategoryIndex()
+        self.suggestions = SuggestIndex()
+        self.rendered = 0  # Posts rendered from markdown by this process
+        self.indexed = 0   # Posts added to the search index
+        self.catalog = PostCatalog(self.md_folder)
+        self.catalog.add_listener(self._on_post_changed)
+        self._scanned = False
+        self.catalog.scan()
+        self._scanned = True
+
+    def _on_post_changed(self, path, signature):
+        """Drop stale state for a post the catalog saw change"""
+        self.post_cache.invalidate(path)
+        if signature is None and self.render_store is not None:
+            self.render_store.delete(path)
+        with self._index_lock:
+            self._unindexed.add(path)
+        changed_at = time.time() if self._scanned else None
+        if signature is None:
+            self.categories.remove(path, changed_at)
+            self.suggestions.remove(path)
+        else:
+            meta = self.get_metadata(path)
+            self.categories.add(path, meta, signature, changed_at)
+            self.suggestions.add(path, meta and meta['metadata'])
 
-    @lru_cache(maxsize=128)
     def get_post(self, filename):
         """Retrieve and convert a markdown post with metadata"""
         if not is_safe_path(filename):
             return None
 
-        parts = filename.split('/')
-        file_path = os.path.join(self.md_folder, *parts) + '.md'
-        
+        file_path = self.post_file_path(filename)
         if not os.path.isfile(file_path):
+            self.post_cache.invalidate(filename)
             return None
-        
+
+        return self.post_cache.get(filename, file_path, lambda: self._load_post(filename, file_path))
+
+    def _load_post(self, filename, file_path):
+        """Read a post from disk, rendering it unless the render store has this version"""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                
-                # Parse front matter
-                metadata = {}
-                if content.startswith('---\n'):
-                    parts = content.split('---\n', 2)
-                    if len(parts) > 2:
-                        try:
-                            metadata = yaml.safe_load(parts[1]) or {}
-                        except yaml.YAMLError as e:
-                            logging.error(f"YAML parsing error in {filename}: {str(e)}")
-                            metadata = {}
-                        content = parts[2]
-                
-                # Default metadata
-                metadata.setdefault('title', filename.split('/')[-1])
-                
-                # Sanitize HTML content
-                html_content = markdown.markdown(content)
-                sanitized_html = sanitize_html(html_content)
-                
-                return {
-                    'html': sanitized_html,
-                    'metadata': metadata
-                }
+            with open(file_path, "rb") as f:
+                source = f.read()
+            digest = hashlib.sha1(source).hexdigest()
+
+            store = self.render_store
+            if store is None:
+                return self._render(filename, source)
+            post = store.get(filename, digest)
+            if post is not None:
+                return post
+
+            # Another worker process may already be rendering this version
+            timeout = self.post_cache.loads.timeout
+            if not store.claim(filename, digest, timeout):
+                post = store.wait(filename, digest, timeout)
+                if post is not None:
+                    return post
+            try:
+                post = self._render(filename, source)
+                store.put(filename, digest, post)
+            finally:
+                store.release(filename, digest)
+            return post
         except Exception as e:
             logging.error(f"Error loading post {filename}: {str(e)}")
             return None
 
-    @lru_cache(maxsize=128)
+    def _render(self, filename, source):
+        self.rendered += 1
+        return render_post(filename, decode_source(source))
+
+    def get_metadata(self, filename):
+        """Retrieve a post's front matter without rendering its body"""
+        if not is_safe_path(filename):
+            return None
+
+        file_path = self.post_file_path(filename)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        key = (filename, st.st_mtime_ns, st.st_size)
+        return self.metadata_loads.do(key, lambda: self._load_metadata(filename, file_path))
+
+    def _load_metadata(self, filename, file_path):
+        """Read only the YAML header between the --- fences"""
+        try:
+            metadata = {}
+            with open(file_path, "r", encoding="utf-8") as f:
+                if f.readline() == '---\n':
+                    header = []
+                    for line in f:
+                        if line.endswith('---\n'):
+                            header.append(line[:-4])
+                            metadata = parse_front_matter(''.join(header), filename)
+                            break
+                        header.append(line)
+
+            metadata.setdefault('title', filename.split('/')[-1])
+            date_str = metadata.get('date', '')
+            return {
+                'title': metadata['title'],
+                'date_str': date_str,
+                'date_obj': parse_post_date(date_str),
+                'image': post_image_url(filename, metadata.get('image')),
+                'metadata': metadata
+            }
+        except Exception as e:
+            logging.error(f"Error loading metadata for {filename}: {str(e)}")
+            return None
+
     def list_posts(self):
         """List all available blog posts"""
-        posts = []
-        for root, dirs, files in os.walk(self.md_folder):
-            for file in files:
-                if file.endswith(".md"):
-                    full_path = os.path.join(root, file)
-                    if os.path.getsize(full_path) == 0:
-                        continue  # Skip empty files
-                    
-                    relative_path = os.path.relpath(full_path, self.md_folder)
-                    post_name = relative_path[:-3].replace("\\", "/")
-                    posts.append({'path': post_name})
-        
-        # Sort alphabetically by path
-        return sorted(posts, key=lambda x: x['path'].lower())
+        return self.catalog.posts()
 
-# Initialize application components
-app = Flask(__name__)
-config = BlogConfig()
-blog_manager = BlogManager(config.MD_FOLDER)
-app.logger.setLevel(logging.DEBUG if config.DEBUG else logging.ERROR)
+    def post_file_path(self, filename):
+        """Return the markdown file backing a post path"""
+        return os.path.join(self.md_folder, *filename.split('/')) + '.md'
+
+    def page_version(self, kind, name=None):
+        """Return (version, last modified timestamp) for a page's inputs, or None if uncacheable"""
+        if kind == 'post':
+            signature = self.catalog.signature(name)
+            if signature is None:
+                return None
+            return f"post:{name}:{signature}", signature[0] / 1e9
+        with self.categories._lock:
+            node = self.categories.root if kind in ('home', 'feed', 'sitemap') else self.categories.node(name)
+            if node is None:
+                return None
+            return f"{kind}:{name}:{node.digest:016x}:{node.count}", node.last_modified
+
+    def warm_up(self, workers=None):
+        """Render every post across a process pool and fill the caches"""
+        started = time.perf_counter()
+        posts = [path for path in self.list_posts() if is_safe_path(path)]
+        known = self.render_store.digests() if self.render_store is not None else {}
+        jobs = [(path, self.post_file_path(path), known.get(path)) for path in posts]
+        workers = workers or os.cpu_count() or 1
+        total = len(jobs)
+        logging.info(f"Warming {total} posts with {workers} workers")
+
+        rendered = 0
+        done = 0
+        step = max(total // 10, 1)
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            chunksize = max(1, min(64, total // (workers * 4) or 1))
+            for path, signature, digest, post in pool.map(_render_post_job, jobs, chunksize=chunksize):
+                done += 1
+                if post is not None:
+                    rendered += 1
+                    self.rendered += 1
+                    if self.render_store is not None:
+                        self.render_store.put(path, digest, post)
+                    self.post_cache.put(path, signature, post, digest if self.post_cache.verify_hash else None)
+                if done % step == 0 or done == total:
+                    logging.info(f"Warm-up progress: {done}/{total} posts")
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Warm-up finished: {rendered} rendered, {total - rendered} already cached, {elapsed:.2f}s")
+        return {'posts': total, 'rendered': rendered, 'seconds': elapsed}
+
+    def after_fork(self, poll_interval=BlogConfig.CATALOG_POLL_INTERVAL, poll=BlogConfig.CATALOG_POLL):
+        """Bring a forked worker's catalog and derived indexes up to date, then watch md/"""
+        # The rescan updates the category and suggestion indexes through _on_post_changed
+        self.catalog.after_fork(poll_interval, poll)
+        self.sync_search_index()
+
+    def sync_search_index(self, deadline=None):
+        """Re-index only the posts the catalog reported as changed
+
+        Stops once deadline (a time.perf_counter() value) passes, leaving the
+        rest for the next call. Returns True if the index is up to date.
+        """
+        timeout = -1 if deadline is None else max(deadline - time.perf_counter(), 0)
+        if not self._index_lock.acquire(timeout=timeout):
+            return False
+        try:
+            while self._unindexed:
+                if deadline is not None and time.perf_counter() > deadline:
+                    return False
+                path = self._unindexed.pop()
+                post_data = self.get_post(path) if path in self.catalog else None
+                if post_data:
+                    self.search_index.add(path, post_data['metadata'], post_data['text'])
+                    self.indexed += 1
+                else:
+                    self.search_index.remove(path)
+            return True
+        finally:
+            self._index_lock.release()
+
+class SearchIndex:
+    """In-memory inverted index over post title, author, date, path and body text"""
+    TOKEN_RE = re.compile(r'\w+')
+    FIELDS = ('title', 'content', 'path', 'date', 'author')
+    FIELD_WEIGHTS = (3.0, 1.0, 2.0, 1.0, 1.0)  # Title and path matches rank higher
+    CONTENT = FIELDS.index('content')
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    SNIPPET_LENGTH = 200
+    SNIPPET_LEAD = 60  # Characters of context kept before the first match
+    DEADLINE_CHECK = 256  # Posts matched between checks of a search's deadline
+    EXPANSION_LIMIT = 256  # Vocabulary tokens one query term may stand for before results are partial
+
+    def __init__(self):
+        self._postings = {}  # token -> {path: array of positions}
+        self._docs = {}      # path -> indexed fields and excerpt source
+        self._length = 0     # Total tokens over all documents, for BM25 length normalisation
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, path, metadata, text):
+        """Index (or re-index) a single post"""
+        values = {
+            'title': str(metadata.get('title', '')),
+            'content': text,
+            'path': path,
+            'date': str(metadata.get('date', '')),
+            'author': str(metadata.get('author', '')),
+        }
+        fields = [values[name].lower() for name in self.FIELDS]
+
+        tokens = {}
+        starts = []
+        offsets = None
+        position = 0
+        for i, field in enumerate(fields):
+            starts.append(position)
+            content = i == self.CONTENT and len(field) == len(text)
+            if content:
+                offsets = array('I')  # Character offset of every body token, for snippets and matching
+            for match in self.TOKEN_RE.finditer(field):
+                tokens.setdefault(match.group(), []).append(position)
+                if content:
+                    offsets.append(match.start())
+                position += 1
+            position += 1  # Keep tokens of different fields from being adjacent
+        if offsets is not None:
+            # The body is matched in windows of the original text (see _contains), not a lowercased copy
+            fields[self.CONTENT] = None
+
+        # Exact-size arrays of C ints; tokens are interned so every post's tuple shares the postings' keys
+        tokens = {sys.intern(token): array('I', positions) for token, positions in tokens.items()}
+
+        with self._lock:
+            self.remove(path)
+            for token, positions in tokens.items():
+                self._postings.setdefault(token, {})[path] = positions
+
+            self._length += position
+            self._docs[path] = {
+                'fields': tuple(fields),
+                'tokens': tuple(tokens),
+                'starts': tuple(starts),
+                'length': position,
+                'offsets': offsets,
+                'title': metadata.get('title', path.split('/')[-1]),
+                'date': metadata.get('date', ''),
+                'author': metadata.get('author', ''),
+                'text': text,
+            }
+
+    def remove(self, path):
+        """Drop a post from the index"""
+        with self._lock:
+            doc = self._docs.pop(path, None)
+            if not doc:
+                return
+            self._length -= doc['length']
+            for token in doc['tokens']:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(path, None)
+                if not postings:
+                    del self._postings[token]
+
+    def get(self, path):
+        """Return the indexed document for a post"""
+        return self._docs.get(path)
+
+    def search(self, query, limit=None, offset=0, deadline=None):
+        """Return (match count, [(path, snippet)], partial) for posts containing query, best first
+
+        Posts must contain query as a case-insensitive substring; matches are
+        ranked by BM25 over the query's tokens, keeping only the top
+        offset + limit in a bounded heap. Once deadline (a time.perf_counter()
+        value) passes, or a term expands to too many tokens, only what was
+        found so far is ranked and partial is True. Every stage makes some
+        progress before giving up, so a cut search still returns matches.
+        """
+        query = query.lower()
+        terms = list(self.TOKEN_RE.finditer(query))
+        with self._lock:
+            partial = False
+            if not terms:
+                expansions = []
+                starts = dict.fromkeys(self._docs, ())
+            else:
+                expansions = []
+                for match in terms:
+                    tokens, complete = self._expand(query, match, deadline)
+                    expansions.append(tokens)
+                    partial = partial or not complete
+                starts, complete = self._phrase_starts(expansions, deadline)
+                partial = partial or not complete
+
+            matches = []
+            lead = terms[0].start() if terms else 0
+            for i, path in enumerate(starts):
+                if (matches and deadline is not None and not i % self.DEADLINE_CHECK
+                        and time.perf_counter() > deadline):
+                    partial = True
+                    break
+                if self._contains(self._docs[path], query, lead, starts[path]):
+                    matches.append(path)
+            scores, complete = self._scores(matches, expansions, deadline)
+            partial = partial or not complete
+            count = len(matches) if limit is None else offset + limit
+            ranked = heapq.nsmallest(count, matches, key=lambda p: (-scores[p], p.lower()))[offset:]
+            return len(matches), [(path, self.snippet(path, starts[path])) for path in ranked], partial
+
+    def _contains(self, doc, query, lead, starts):
+        """Return True if one of a post's fields contains the lowercased query
+
+        The body is only lowercased in short windows around the phrase's start
+        positions; lead is the number of query characters before its first token.
+        """
+        fields = doc['fields']
+        if any(field is not None and query in field for field in fields):
+            return True
+        if fields[self.CONTENT] is not None:
+            return False
+        text = doc['text']
+        if not starts:
+            return query in text  # No word characters in the query, so case cannot matter
+        offsets = doc['offsets']
+        first = doc['starts'][self.CONTENT]
+        for position in starts:
+            index = position - first
+            if not 0 <= index < len(offsets):
+                continue
+            offset = offsets[index]
+            token = self.TOKEN_RE.match(text, offset)
+            end = (token.end() if token else offset) + len(query)
+            if query in text[max(offset - lead, 0):end].lower():
+                return True
+        return False
+
+    def _expand(self, query, match, deadline=None):
+        """Return (vocabulary tokens that can stand in for one query term, whether that list is complete)
+
+        The term itself comes first. The vocabulary scan stops at
+        EXPANSION_LIMIT tokens, or at the deadline once a token was found.
+        """
+        term = match.group()
+        left_bounded = match.start() > 0
+        right_bounded = match.end() < len(query)
+        tokens = [term] if term in self._postings else []
+        if left_bounded and right_bounded:
+            return tokens, True
+        if left_bounded:
+            fits = lambda token: token.startswith(term)
+        elif right_bounded:
+            fits = lambda token: token.endswith(term)
+        else:
+            fits = lambda token: term in token
+        for i, token in enumerate(self._postings):
+            if len(tokens) >= self.EXPANSION_LIMIT:
+                return tokens, False
+            if (tokens and deadline is not None and not i % (self.DEADLINE_CHECK * 16)
+                    and time.perf_counter() > deadline):
+                return tokens, False
+            if token != term and fits(token):
+                tokens.append(token)
+        return tokens, True
+
+    def _phrase_starts(self, expansions, deadline=None):
+        """Return ({post: start positions} where the query's tokens occur consecutively, whether complete)
+
+        Past the deadline each term stops merging further tokens' postings,
+        which can only leave out posts, never add wrong ones.
+        """
+        term_positions = []
+        complete = True
+        for i, tokens in enumerate(expansions):
+            positions = {}
+            for token in tokens:
+                if positions and deadline is not None and time.perf_counter() > deadline:
+                    complete = False
+                    break
+                for path, token_positions in self._postings[token].items():
+                    positions.setdefault(path, set()).update(p - i for p in token_positions)
+            if not positions:
+                return {}, complete
+            term_positions.append(positions)
+
+        term_positions.sort(key=len)
+        candidates = {}
+        for path, starts in term_positions[0].items():
+            for positions in term_positions[1:]:
+                other = positions.get(path)
+                if other is None:
+                    break
+                starts = starts & other
+                if not starts:
+                    break
+            else:
+                candidates[path] = starts
+        return candidates, complete
+
+    def _scores(self, matches, expansions, deadline=None):
+        """Return (BM25 score of each matching post, whether every post was scored)
+
+        Term frequencies are weighted by field. Posts not reached before the
+        deadline keep the scores of the terms already counted.
+        """
+        scores = dict.fromkeys(matches, 0.0)
+        if not matches or not expansions:
+            return scores, True
+        total = len(self._docs)
+        average = self._length / total
+        k1, b = self.BM25_K1, self.BM25_B
+        for tokens in expansions:
+            postings = [self._postings[token] for token in tokens]
+            frequency = min(total, sum(len(p) for p in postings))
+            idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for i, path in enumerate(matches):
+                if (i and deadline is not None and not i % self.DEADLINE_CHECK
+                        and time.perf_counter() > deadline):
+                    return scores, False
+                doc = self._docs[path]
+                starts = doc['starts']
+                tf = 0.0
+                for token_postings in postings:
+                    for position in token_postings.get(path, ()):
+                        tf += self.FIELD_WEIGHTS[bisect.bisect_right(starts, position) - 1]
+                if tf:
+                    norm = k1 * (1 - b + b * doc['length'] / average)
+                    scores[path] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores, True
+
+    def snippet(self, path, starts=()):
+        """Cut an excerpt of the post's text around the earliest body match"""
+        doc = self._docs[path]
+        text = doc['text']
+        offsets = doc['offsets']
+        first = doc['starts'][self.CONTENT]
+        body = [p - first for p in starts if 0 <= p - first < len(offsets or ())]
+
+        begin = 0
+        if body:
+            match = offsets[min(body)]
+            if match + self.SNIPPET_LENGTH > len(text):
+                match = max(len(text) - self.SNIPPET_LENGTH + self.SNIPPET_LEAD, 0)
+            if match > self.SNIPPET_LEAD:
+                begin = match - self.SNIPPET_LEAD
+                space = text.find(' ', begin, match)
+                if space != -1:
+                    begin = space + 1
+        end = begin + self.SNIPPET_LENGTH
+        excerpt = text[begin:end]
+        if begin:
+            excerpt = '...' + excerpt.lstrip()
+        if end < len(text):
+            excerpt += '...'
+        return excerpt
+
+class SuggestIndex:
+    """Prefix index of post titles, categories and tags for search-as-you-type"""
+    WORD_RE = re.compile(r'\w+')
+    KIND_ORDER = {'category': 0, 'tag': 1, 'title': 2}
+    SCAN_LIMIT = 256  # Prefix matches ranked per query; bounds the cost of one-letter prefixes
+    EXAMINE_LIMIT = 1024  # Labels checked per multi-word query, matching or not
+
+    def __init__(self):
+        self._terms = {}     # (kind, label) -> [url, number of posts, normalised label]
+        self._vocab = []     # Sorted distinct words of every normalised label
+        self._words = {}     # word -> sorted [(kind, label)]; kinds sort category, tag, title
+        self._grams = {}     # trigram -> {word}, for the typo pass
+        self._posts = {}     # post path -> [(kind, label)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalise(text):
+        return ' '.join(SuggestIndex.WORD_RE.findall(text.lower()))
+
+    @staticmethod
+    def trigrams(word):
+        padded = f"  {word}"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def terms(path, metadata):
+        """Return the (kind, label, url) suggestions one post contributes"""
+        terms = [('title', str(metadata.get('title', path.split('/')[-1])), f"/{path}")]
+        parts = path.split('/')[:-1]
+        for depth in range(1, len(parts) + 1):
+            category = '/'.join(parts[:depth])
+            label = ' / '.join(display_name(part) for part in parts[:depth])
+            terms.append(('category', label, f"/category/{category}"))
+        tags = metadata.get('tags') or []
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        for tag in tags:
+            tag = str(tag).strip()
+            if tag:
+                terms.append(('tag', tag, f"/search?{urlencode({'q': tag})}"))
+        return terms
+
+    def add(self, path, metadata):
+        """Index (or re-index) the suggestions of one post"""
+        with self._lock:
+            self._remove(path)
+            if metadata is None:
+                return
+            entries = []
+            for kind, label, url in self.terms(path, metadata):
+                entry = (kind, label)
+                if entry in entries:
+                    continue
+                entries.append(entry)
+                term = self._terms.get(entry)
+                if term is not None:
+                    term[1] += 1
+                    continue
+                normalised = self.normalise(label)
+                self._terms[entry] = [url, 1, normalised]
+                for word in dict.fromkeys(normalised.split(' ')):
+                    owners = self._words.get(word)
+                    if owners is None:
+                        owners = self._words[word] = []
+                        bisect.insort(self._vocab, word)
+                        # Numbers are never typo-corrected, and every title tends to have its own
+                        if not word.isdigit():
+                            for gram in self.trigrams(word):
+                                self._grams.setdefault(gram, set()).add(sys.intern(word))
+                    bisect.insort(owners, entry)
+            self._posts[path] = entries
+
+    def remove(self, path):
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path):
+        for entry in self._posts.pop(path, ()):
+            term = self._terms[entry]
+            term[1] -= 1
+            if term[1]:
+                continue
+            del self._terms[entry]
+            for word in dict.fromkeys(term[2].split(' ')):
+                owners = self._words.get(word)
+                if owners is None:
+                    continue
+                j = bisect.bisect_left(owners, entry)
+                if j < len(owners) and owners[j] == entry:
+                    del owners[j]
+                if not owners:
+                    del self._words[word]
+                    del self._vocab[bisect.bisect_left(self._vocab, word)]
+                    for gram in self.trigrams(word):
+                        grams = self._grams.get(gram)
+                        if grams is not None:
+                            grams.discard(word)
+                            if not grams:
+                                del self._grams[gram]
+
+    def suggest(self, prefix, limit=8):
+        """Return up to limit {'label', 'kind', 'url'} completions for a prefix"""
+        query = self.normalise(prefix)
+        if not query:
+            return []
+        with self._lock:
+            ranked = {}
+            for entry in self._prefixed(query):
+                self._rank(ranked, entry, 0)
+            if len(ranked) < limit and ' ' not in query:
+                self._fuzzy(ranked, query)
+            best = heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1])
+            return [
+                {'label': label, 'kind': kind, 'url': self._terms[(kind, label)][0]}
+                for (kind, label), _ in best
+            ]
+
+    def _prefixed(self, query):
+        """Yield up to SCAN_LIMIT entries with a run of words that starts with query"""
+        scanned = 0
+        if ' ' in query:
+            # Every word but the last is complete, so only the owners of the rarest can match
+            needle = f" {query}"
+            owners = min((self._words.get(word, ()) for word in query.split(' ')[:-1]), key=len)
+            for entry in owners[:self.EXAMINE_LIMIT]:
+                if needle in f" {self._terms[entry][2]}":
+                    yield entry
+                    scanned += 1
+                    if scanned == self.SCAN_LIMIT:
+                        return
+            return
+        i = bisect.bisect_left(self._vocab, query)
+        while i < len(self._vocab) and self._vocab[i].startswith(query):
+            for entry in self._words[self._vocab[i]]:
+                yield entry
+                scanned += 1
+                if scanned == self.SCAN_LIMIT:
+                    return
+            i += 1
+
+    def _rank(self, ranked, entry, distance):
+        """Keep the best rank of an entry: fewest typos, then most posts, then kind and label"""
+        rank = (distance, -self._terms[entry][1], self.KIND_ORDER[entry[0]], entry[1].lower())
+        if entry not in ranked or rank < ranked[entry]:
+            ranked[entry] = rank
+
+    def _fuzzy(self, ranked, query):
+        """Add entries with a word whose prefix is within a small edit distance of the query"""
+        allowed = 1 if len(query) >= 4 else 0
+        if len(query) >= 8:
+            allowed = 2
+        if not allowed:
+            return
+        shared = {}
+        for gram in self.trigrams(query):
+            for word in self._grams.get(gram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        # Each edit changes at most four of the query's trigrams (a swap of neighbours)
+        needed = max(len(query) - 4 * allowed, 1)
+        scanned = 0
+        for word, count in shared.items():
+            if count < needed:
+                continue
+            distance = prefix_distance(query, word, allowed)
+            if distance <= allowed:
+                # Owners sort categories and tags first, so a capped scan keeps them, as in _prefixed
+                for entry in self._words[word][:self.SCAN_LIMIT - scanned]:
+                    self._rank(ranked, entry, distance)
+                scanned += min(len(self._words[word]), self.SCAN_LIMIT - scanned)
+                if scanned == self.SCAN_LIMIT:
+                    return
+
+def prefix_distance(query, word, limit):
+    """Edit distance, counting swapped neighbours as one edit, between query and the
+    closest prefix of word, or limit + 1 if it is larger"""
+    before = None
+    previous = list(range(len(word) + 1))
+    for i, char in enumerate(query, 1):
+        current = [i]
+        for j, other in enumerate(word, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if before and j > 1 and char == word[j - 2] and query[i - 2] == other:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(min(previous), limit + 1)
 
 def is_safe_path(path):
     """Check if the path is safe and does not contain directory traversal attempts"""
     return re.match(r'^[a-zA-Z0-9_\-/]+$', path) is not None
 
+def post_image_url(path, image):
+    """Resolve a front matter image against the post's folder, returning its URL or None"""
+    if not image or not isinstance(image, str):
+        return None
+    image = image.strip()
+    if re.match(r'^https?://', image):
+        return image
+    if not image.startswith('/'):
+        image = '/' + posixpath.normpath(posixpath.join(posixpath.dirname(path), image))
+    return quote(image)
+
+EXPORT_THUMBNAILS = '_thumbnails'  # Export folder holding listing thumbnails, resized ahead of time
+
+def thumbnail_url(image):
+    """Return a listing thumbnail's URL: ?w= when serving, a resized copy when exporting
+
+    Static hosts ignore query strings, so an export points at the copy
+    written by export_assets instead.
+    """
+    if not image.startswith('/'):
+        return image
+    if has_request_context() and request.environ.get('blog.export'):
+        if os.path.splitext(image)[1].lower() not in AssetStore.RESIZABLE:
+            return image
+        return f"/{EXPORT_THUMBNAILS}/{BlogConfig.THUMBNAIL_WIDTH}{image}"
+    return f"{image}?w={BlogConfig.THUMBNAIL_WIDTH}"
+
+def parse_front_matter(header, filename):
+    """Parse a post's YAML front matter, returning {} when it is invalid"""
+    try:
+        return yaml.safe_load(header) or {}
+    except yaml.YAMLError as e:
+        logging.error(f"YAML parsing error in {filename}: {str(e)}")
+        return {}
+
+def parse_post_date(value):
+    """Parse a DD-MM-YYYY front matter date, returning None if it is missing or invalid"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        day, month, year = map(int, value.split('-'))
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+def decode_source(source):
+    """Decode markdown file bytes the way open(..., 'r') would"""
+    return source.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+def render_post(filename, content):
+    """Convert markdown source into sanitized HTML, metadata and plain text"""
+    # Parse front matter
+    metadata = {}
+    if content.startswith('---\n'):
+        parts = content.split('---\n', 2)
+        if len(parts) > 2:
+            metadata = parse_front_matter(parts[1], filename)
+            content = parts[2]
+
+    # Default metadata
+    metadata.setdefault('title', filename.split('/')[-1])
+
+    # Sanitize HTML content
+    html_content = markdown_to_html(content)
+    sanitized_html, text = sanitize_html_with_text(html_content)
+
+    return {
+        'html': sanitized_html,
+        'metadata': metadata,
+        'text': text
+    }
+
+def markdown_to_html(content):
+    """Convert a markdown body to unsanitized HTML"""
+    return markdown.markdown(content)
+
+def _render_post_job(job):
+    """Process pool worker: render one post unless its source digest is already stored"""
+    filename, file_path, known_digest = job
+    try:
+        with open(file_path, "rb") as f:
+            signature = os.fstat(f.fileno())
+            source = f.read()
+        digest = hashlib.sha1(source).hexdigest()
+        signature = (signature.st_mtime_ns, signature.st_size)
+        if digest == known_digest:
+            return filename, signature, digest, None
+        return filename, signature, digest, render_post(filename, decode_source(source))
+    except Exception as e:
+        logging.error(f"Error warming post {filename}: {str(e)}")
+        return filename, None, None, None
+
+class HTMLSanitizer(HTMLParser):
+    """Single-pass sanitizer that re-serializes parser events and collects plain text"""
+    DROPPED_TAGS = frozenset(['script', 'iframe', 'style'])
+    VOID_TAGS = frozenset([
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+        'link', 'meta', 'param', 'source', 'track', 'wbr'
+    ])
+    PRESERVE_WHITESPACE_TAGS = ('pre', 'textarea')
+    URL_ATTRS = frozenset(['href', 'src', 'action', 'formaction', 'background', 'poster', 'xlink:href', 'data'])
+    SRCSET_ATTRS = frozenset(['srcset', 'imagesrcset'])  # Comma-separated lists of URLs
+    DROPPED_ATTRS = frozenset(['http-equiv'])  # <meta http-equiv="refresh"> navigates like a link
+    UNSAFE_SCHEMES = ('javascript:', 'vbscript:')
+    _URL_NOISE_RE = re.compile(r'[\x00-\x20]+')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._html = []
+        self._text = []
+        self._open = []
+        self._pending = []
+        self._skip_tag = None
+        self._skip_depth = 0
+
+    @classmethod
+    def _unsafe_url(cls, value):
+        return cls._URL_NOISE_RE.sub('', value).lower().startswith(cls.UNSAFE_SCHEMES)
+
+    @classmethod
+    def _unsafe_attr(cls, name, value):
+        """Return True for event handlers, script URLs and attributes that navigate on their own"""
+        if name.startswith('on') or name in cls.DROPPED_ATTRS:
+            return True
+        if name in cls.URL_ATTRS:
+            return cls._unsafe_url(value)
+        if name in cls.SRCSET_ATTRS:
+            return any(cls._unsafe_url(candidate) for candidate in value.split(','))
+        return False
+
+    @classmethod
+    def _safe_attrs(cls, attrs):
+        parts = []
+        for name, value in attrs:
+            if value is None:
+                value = ''
+            if cls._unsafe_attr(name, value):
+                continue
+            parts.append(f' {name}="{escape(value, quote=True)}"')
+        return ''.join(parts)
+
+    def _skipping(self, tag, opening):
+        if self._skip_tag is None:
+            if opening and tag in self.DROPPED_TAGS:
+                self._skip_tag = tag
+                self._skip_depth = 1
+                return True
+            return False
+        if tag == self._skip_tag:
+            self._skip_depth += 1 if opening else -1
+            if self._skip_depth == 0:
+                self._skip_tag = None
+        return True
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = ''.join(self._pending)
+        self._pending = []
+        # Collapse whitespace-only runs between tags, as BeautifulSoup did
+        if not data.strip(' \t\n\r\f') and not any(tag in self._open for tag in self.PRESERVE_WHITESPACE_TAGS):
+            data = '\n' if '\n' in data else ' '
+        self._html.append(escape(data, quote=False))
+        self._text.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        if self._skipping(tag, True):
+            return
+        self._flush()
+        self._html.append(f'<{tag}{self._safe_attrs(attrs)}>')
+        if tag not in self.VOID_TAGS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skip_tag is not None or tag in self.DROPPED_TAGS:
+            return
+        self._flush()
+        self._html.append(f'<{tag}{self._safe_attrs(attrs)}/>')
+
+    def handle_endtag(self, tag):
+        if self._skipping(tag, False) or tag not in self._open:
+            return
+        self._flush()
+        while self._open:
+            open_tag = self._open.pop()
+            self._html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        # Text on either side of a dropped element joins into one run
+        if self._skip_tag is None:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        # Dropped, like a script: re-emitted, a comment holding "--!>" or "-->" would close
+        # early and expose what follows. The text on either side joins into one run.
+        pass
+
+    def handle_decl(self, decl):
+        if self._skip_tag is None:
+            self._flush()
+            self._html.append(f'<!{decl}>')
+
+    def result(self):
+        """Finish parsing and return (sanitized html, plain text)"""
+        self.close()
+        self._flush()
+        while self._open:
+            self._html.append(f'</{self._open.pop()}>')
+        return ''.join(self._html), ''.join(self._text)
+
+def sanitize_html_with_text(html):
+    """Sanitize HTML and extract its plain text in the same pass"""
+    sanitizer = HTMLSanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result()
+
 def sanitize_html(html):
     """Sanitize HTML content to prevent XSS attacks"""
-    soup = BeautifulSoup(html, 'html.parser')
-    for tag in soup.find_all():
-        if tag.name in ['script', 'iframe', 'style']:
-            tag.decompose()
-    return str(soup)
-
-@app.before_request
-def before_request():
-    """Clear cache in development mode"""
-    if app.debug:
-        blog_manager.get_post.cache_clear()
-        blog_manager.list_posts.cache_clear()
+    return sanitize_html_with_text(html)[0]
+
+def display_name(slug):
+    """Turn a path segment like 'machine-learning' into 'Machine Learning'"""
+    return ' '.join([part.capitalize() for part in slug.split('-')])
 
 def generate_breadcrumbs(path):
     """Generate breadcrumb navigation for a given path"""
@@ -312,163 +2635,393 @@ def generate_breadcrumbs(path):
     for i, part in enumerate(parts):
         accumulated.append(part)
         breadcrumbs.append({
-            'name': ' '.join([p.capitalize() for p in part.split('-')]),
+            'name': display_name(part),
             'url': '/category/' + '/'.join(accumulated) if i < len(parts)-1 else f"/{'/'.join(accumulated)}"
         })
     return breadcrumbs
 
+# Initialize application components
+app = Flask(__name__)
+config = BlogConfig()
+metrics = None
+if config.METRICS:
+    # Wrapped in place, so nothing is timed when metrics are disabled
+    metrics = Metrics()
+    module = sys.modules[__name__]
+    for owner, name, stage in [
+        (PostCatalog, '_walk', 'walk'),
+        (module, 'parse_front_matter', 'yaml'),
+        (module, 'markdown_to_html', 'markdown'),
+        (module, 'sanitize_html_with_text', 'sanitize'),
+        # render_page and stream_page go through these two, so wrapping them as well would count twice
+        (TemplateRenderer, 'render', 'template'),
+        (TemplateRenderer, 'stream', 'template'),
+    ]:
+        metrics.instrument(owner, name, stage)
+# The watcher is started by whichever process serves requests (__main__ below, or gunicorn's
+# post_fork), never at import: a pre-forking master must not fork while a watcher thread holds a lock
+blog_manager = BlogManager(config.MD_FOLDER)
+app.logger.setLevel(logging.DEBUG if config.DEBUG else logging.ERROR)
+
+class AssetPathConverter(PathConverter):
+    """A path whose last segment has a file extension; ranked ahead of the post route"""
+    regex = r'[^/](?:[^/]*/)*[^/]*\.[A-Za-z0-9]+'
+    weight = 150
+
+app.url_map.converters['asset'] = AssetPathConverter
+TemplateRenderer.init_app(app)
+response_cache = ResponseCache(config.RESPONSE_CACHE_SIZE)
+search_limiter = AdmissionLimiter(config.SEARCH_CONCURRENCY, config.SEARCH_QUEUE, config.SEARCH_QUEUE_TIMEOUT,
+                                  config.SEARCH_TIME_BUDGET)
+search_cache = TTLCache(config.SEARCH_CACHE_SIZE, config.SEARCH_CACHE_TTL)
+COMPRESSIBLE_MIMETYPES = frozenset(['text/html', 'text/css', 'text/plain', 'application/json', 'application/xml'])
+
+def page_etag(kind, name=None):
+    """Return (etag, last modified datetime) for a page, or None if it cannot be cached"""
+    version = blog_manager.page_version(kind, name)
+    if version is None:
+        return None
+    raw_version, modified_at = version
+    etag = hashlib.sha1(f"{TemplateRenderer.version}:{RenderStore.RENDER_VERSION}:{raw_version}".encode('utf-8')).hexdigest()
+    last_modified = datetime.fromtimestamp(int(modified_at), timezone.utc) if modified_at else None
+    return etag, last_modified
+
+def negotiate_encoding():
+    """Pick brotli or gzip from the request's Accept-Encoding, or None for identity"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+def compress_body(data, encoding):
+    """Compress a response body with the negotiated encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=config.GZIP_LEVEL, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    """Compress uncached responses such as search results and the stylesheet"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.content_length is not None and response.content_length < config.COMPRESS_MIN_SIZE:
+        return response
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+    response.set_data(compress_body(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+# Query parameters that change a cached page: listing pagination and the navbar search box
+CACHED_PAGE_PARAMS = ('page', 'after', 'q')
+
+def cached_page(kind, mimetype='text/html'):
+    """Serve a page from the response cache, answering conditional requests with 304"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            name = next(iter(kwargs.values()), None)
+            version = page_etag(kind, name)
+            if version is None:
+                return view(**kwargs)
+            etag, last_modified = version
+
+            # Each encoding is a separate representation, so it gets its own strong ETag
+            encoding = negotiate_encoding()
+            if encoding:
+                etag = f"{etag}-{encoding}"
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response_cache.not_modified += 1
+                response = Response(status=304)
+            else:
+                # The feed and sitemap link to the requested host unless SITE_URL is set.
+                # Other query parameters are ignored so junk ones cannot flood the cache.
+                params = tuple(request.args.get(name) for name in CACHED_PAGE_PARAMS)
+                key = (request.host_url, request.path, params)
+                entry = response_cache.get(key, etag)
+                if entry is None:
+                    g.cacheable = True
+                    body = view(**kwargs)
+                    if isinstance(body, Response) and body.is_streamed:
+                        # Streamed pages are too large to keep and are sent uncompressed
+                        body.set_etag(etag[:-len(encoding) - 1] if encoding else etag)
+                        body.last_modified = last_modified
+                        body.headers['Cache-Control'] = 'no-cache'
+                        return body
+                    if not isinstance(body, str) or not g.cacheable:
+                        return body
+                    entry = response_cache.put(key, etag, body.encode('utf-8'))
+                _, body, variants = entry
+                response = Response(body, mimetype=mimetype)
+                if encoding and len(body) >= config.COMPRESS_MIN_SIZE:
+                    if encoding not in variants:
+                        variants[encoding] = compress_body(body, encoding)
+                    response.set_data(variants[encoding])
+                    response.headers['Content-Encoding'] = encoding
+
+            response.vary.add('Accept-Encoding')
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@app.route("/assets/style.<version>.css")
+def stylesheet(version):
+    """Serve the fingerprinted stylesheet with long-lived cache headers"""
+    if version != TemplateRenderer.stylesheet_version:
+        abort(404)
+    body = TemplateRenderer.stylesheet
+    encoding = negotiate_encoding() if len(body) >= config.COMPRESS_MIN_SIZE else None
+    if encoding:
+        variants = TemplateRenderer.stylesheet_variants
+        if encoding not in variants:
+            variants[encoding] = compress_body(body, encoding)
+        body = variants[encoding]
+        version = f"{version}-{encoding}"
+    response = Response(body, mimetype="text/css")
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = "public, max-age=31536000, immutable"
+    response.set_etag(version)
+    return response.make_conditional(request)
+
+@app.route("/<asset:filename>")
+def serve_asset(filename):
+    """Serve an image or attachment from the md folder, resized when ?w= names a configured width"""
+    assets = blog_manager.assets
+    found = assets.resolve(filename)
+    if found is None:
+        abort(404)
+    file_path, st = found
+    etag = assets.digest(file_path, st)
+
+    width = request.args.get('w', type=int)
+    if width:
+        variant = assets.variant(file_path, etag, width)
+        if variant is not None:
+            file_path, etag = variant, f"{etag}-{width}"
+
+    # send_file hands the open file to the server's wsgi.file_wrapper (sendfile
+    # under gunicorn) and answers Range and conditional requests itself
+    response = send_file(file_path, etag=etag, max_age=config.ASSET_MAX_AGE, conditional=True)
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['Content-Security-Policy'] = 'sandbox'
+    return response
+
+@app.route("/_stats/cache")
+def cache_stats():
+    """Expose post cache counters for tuning"""
+    stats = blog_manager.post_cache.stats()
+    stats['responses'] = response_cache.stats()
+    stats['assets'] = blog_manager.assets.stats()
+    if blog_manager.render_store is not None:
+        stats['render_store'] = blog_manager.render_store.stats()
+    return jsonify(stats)
+
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+def finish_request_timer(response):
+    """Record the request's latency and send its stage breakdown as Server-Timing"""
+    started = g.get('request_started')
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        metrics.observe(request.endpoint or 'unmatched', elapsed)
+        response.headers['Server-Timing'] = metrics.server_timing(g.get('stage_timings', {}), elapsed)
+    return response
+
+def metrics_endpoint():
+    """Expose request latencies, stage timings, cache ratios and post counts to Prometheus"""
+    caches = {'post': blog_manager.post_cache.stats(), 'response': response_cache.stats(),
+              'search': search_cache.stats()}
+    if blog_manager.render_store is not None:
+        caches['render_store'] = blog_manager.render_store.stats()
+    ratios = {}
+    for name, stats in caches.items():
+        lookups = stats['hits'] + stats['misses'] + stats.get('stale', 0)
+        ratios[f'cache="{name}"'] = stats['hits'] / lookups if lookups else 0.0
+
+    coalesced = {f'cache="{name}"': stats['loads']['coalesced'] for name, stats in caches.items() if 'loads' in stats}
+    coalesced['cache="metadata"'] = blog_manager.metadata_loads.stats()['coalesced']
+    if 'render_store' in caches:
+        coalesced['cache="render_store"'] = caches['render_store']['coalesced']
+
+    search = search_limiter.stats()
+    counters = {
+        'blog_cache_hits_total': ('Cache hits', {f'cache="{n}"': s['hits'] for n, s in caches.items()}),
+        'blog_cache_misses_total': ('Cache misses', {f'cache="{n}"': s['misses'] for n, s in caches.items()}),
+        'blog_cache_evictions_total': ('Entries evicted to stay within the cache budget',
+                                       {f'cache="{n}"': s['evictions'] for n, s in caches.items() if 'evictions' in s}),
+        'blog_not_modified_total': ('Responses answered with 304 Not Modified', {'': response_cache.not_modified}),
+        'blog_posts_rendered_total': ('Posts rendered from markdown', {'': blog_manager.rendered}),
+        'blog_loads_coalesced_total': ('Duplicate post loads avoided by waiting for a concurrent load', coalesced),
+        'blog_posts_indexed_total': ('Posts added to the search index', {'': blog_manager.indexed}),
+        'blog_search_rejected_total': ('Searches turned away with 503 because too many were running',
+                                       {'': search['rejected']}),
+        'blog_search_partial_total': ('Searches that ran out of time and returned partial results',
+                                      {'': search['partial']}),
+    }
+    gauges = {
+        'blog_cache_hit_ratio': ('Cache hits over lookups', ratios),
+        'blog_cache_bytes': ('Approximate bytes held by the cache',
+                             {f'cache="{n}"': s['bytes'] for n, s in caches.items() if 'bytes' in s}),
+        'blog_posts': ('Posts in the catalog', {'': len(blog_manager.catalog)}),
+        'blog_search_index_documents': ('Posts in the search index', {'': len(blog_manager.search_index)}),
+        'blog_search_queued': ('Searches waiting for a slot', {'': search['waiting']}),
+    }
+    return Response(metrics.render(counters, gauges), mimetype='text/plain; version=0.0.4')
+
+if metrics is not None:
+    app.before_request(start_request_timer)
+    app.after_request(finish_request_timer)
+    app.add_url_rule('/metrics', view_func=metrics_endpoint)
+
 @app.route("/search")
 def search_posts():
     """Handle post search functionality with case insensitivity and proper excerpt casing"""
-    query = request.args.get("q", "").lower().strip()
+    query = ' '.join(request.args.get("q", "").lower().split())
     if not query or len(query) > 100:
         abort(400, description="Invalid search query")
     
-    posts = blog_manager.list_posts()
-    results = []
-    
-    for post in posts:
-        post_data = blog_manager.get_post(post['path'])
-        if not post_data:
-            continue
-            
-        metadata = post_data['metadata']
-        content_html = post_data['html']
-        soup = BeautifulSoup(content_html, 'html.parser')
-        content_original = soup.get_text()
-        content_lower = content_original.lower()  # Lowercase version for search
-        title = metadata.get('title', '').lower()
-        date = metadata.get('date', '').lower()
-        author = metadata.get('author', '').lower()  # Fixed typo: 'auther' -> 'author'
-        path = post['path'].lower()
-        
-        if (query in title or 
-            query in content_lower or  # Search in lowercase content
-            query in path or 
-            query in date or 
-            query in author):
-            
-            # Use original content for proper casing in excerpt
-            excerpt = content_original[:200] + '...' if len(content_original) > 200 else content_original
-            results.append({
-                'path': post['path'],
-                'title': metadata.get('title', post['path'].split('/')[-1]),
-                'excerpt': excerpt,
-                'date': metadata.get('date', ''),
-                'author': metadata.get('author', '')  # Fixed typo here
-            })
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', config.SEARCH_PAGE_SIZE)), 1), config.SEARCH_MAX_LIMIT)
+    except ValueError:
+        abort(400, description="Invalid search range")
     
-    content = "<h1>Search Results</h1>"
-    if results:
-        content += f'<p>Found {len(results)} matches for "{query}"</p>'
-        content += "<ul class='post-list'>"
-        for result in results:
-            content += f"""
-                <li class='post-item'>
-                    <a href="/{result['path']}">{result['title']}</a>
-                    <p class='post-meta'>Posted on {result['date']} by {result['author']}</p>
-                    <p>{result['excerpt']}</p>
-                </li>
-            """
-        content += "</ul>"
+    # Any post change bumps the catalog version, so cached pages never outlive the corpus they came from
+    key = (query, offset, limit, blog_manager.catalog.version)
+    cached = search_cache.get(key)
+    if cached is not None:
+        total, results = cached
+        partial = False
     else:
-        content += f'<div class="error"><p>No results found for "{query}"</p></div>'
+        if not search_limiter.acquire():
+            abort(503, description="Too many searches are running, please try again shortly",
+                  retry_after=math.ceil(config.SEARCH_QUEUE_TIMEOUT) or 1)
+        partial = False
+        try:
+            deadline = search_limiter.deadline()
+            complete = blog_manager.sync_search_index(deadline)
+            index = blog_manager.search_index
+            total, hits, partial = index.search(query, limit=limit, offset=offset, deadline=deadline)
+            partial = partial or not complete
+            results = []
+
+            for path, excerpt in hits:
+                doc = index.get(path)
+                results.append({
+                    'path': path,
+                    'title': doc['title'],
+                    'excerpt': excerpt,
+                    'date': doc['date'],
+                    'author': doc['author']  # Fixed typo here
+                })
+        finally:
+            search_limiter.release(partial)
+        if not partial:
+            search_cache.put(key, (total, results))
+
+    older = newer = None
+    if offset + len(results) < total:
+        older = f"/search?{urlencode({'q': query, 'offset': offset + limit, 'limit': limit})}"
+    if offset:
+        newer = f"/search?{urlencode({'q': query, 'offset': max(offset - limit, 0), 'limit': limit})}"
+    pages = {'first': offset + 1, 'last': offset + len(results), 'total': total, 'older': older, 'newer': newer}
+    content = TemplateRenderer.render('search.html', query=query, results=results, total=total, pages=pages,
+                                      partial=partial)
     
     return TemplateRenderer.render_page(
         title=f"Search: {query}",
         content=content
     )
 
+@app.route("/search/suggest")
+def search_suggest():
+    """Return title, category and tag completions for a search prefix as JSON"""
+    prefix = request.args.get("q", "")
+    if len(prefix) > 100:
+        abort(400, description="Invalid search query")
+    try:
+        limit = min(max(int(request.args.get('limit', config.SUGGEST_LIMIT)), 1), config.SUGGEST_MAX_LIMIT)
+    except ValueError:
+        abort(400, description="Invalid suggestion limit")
+    return jsonify(query=prefix, suggestions=blog_manager.suggestions.suggest(prefix, limit))
+
+def listing_window():
+    """Parse ?page= or ?after= into (offset, limit, after cursor)"""
+    page = request.args.get('page', '1')
+    if not config.PAGE_SIZE or page == 'all':
+        return 0, None, None
+    after = request.args.get('after')
+    if after:
+        return 0, config.PAGE_SIZE, after
+    if not page.isdigit() or int(page) < 1:
+        abort(404)
+    return (int(page) - 1) * config.PAGE_SIZE, config.PAGE_SIZE, None
+
+def pagination(offset, items, total):
+    """Build the pager links for a page showing items from offset onwards"""
+    if offset and offset >= total:
+        abort(404)
+    last = offset + len(items)
+    older = newer = None
+    if last < total:
+        older = f"{request.path}?after={quote(items[-1].path)}"
+    if offset:
+        page = max(offset // config.PAGE_SIZE, 1)
+        newer = request.path if page == 1 else f"{request.path}?page={page}"
+    return {'first': offset + 1, 'last': last, 'total': total, 'older': older, 'newer': newer}
+
+def render_listing(title, name, count, breadcrumbs=None, **context):
+    """Render a listing page, streaming it in chunks when it lists many posts"""
+    if config.STREAM_THRESHOLD and count > config.STREAM_THRESHOLD:
+        chunks = TemplateRenderer.stream_page(title, name, breadcrumbs, **context)
+        return Response(stream_with_context(chunks), mimetype='text/html')
+    content = TemplateRenderer.render(name, **context)
+    return TemplateRenderer.render_page(title=title, content=content, breadcrumbs=breadcrumbs)
+
 @app.route("/category/<path:category>")
+@cached_page('category')
 def category_posts(category):
     """Show posts in a specific category"""
     try:
         if not is_safe_path(category):
             abort(404)
         
-        all_posts = blog_manager.list_posts()
-        filtered_posts = [p for p in all_posts if p['path'].startswith(f"{category}/")]
-        
-        subcategories = {}
-        immediate_posts = []
-        
-        for post in filtered_posts:
-            post_path = post['path']
-            remaining_path = post_path[len(category)+1:]
-            
-            if '/' in remaining_path:
-                subcategory = remaining_path.split('/')[0]
-                subcat_path = f"{category}/{subcategory}"
-                if subcat_path not in subcategories:
-                    subcategories[subcat_path] = 1
-                else:
-                    subcategories[subcat_path] += 1
-            else:
-                immediate_posts.append(post)
-        
-        # Process posts with dates
-        posts_with_dates = []
-        for post in immediate_posts:
-            post_data = blog_manager.get_post(post['path'])
-            if not post_data: continue
-            metadata = post_data['metadata']
-            date_str = metadata.get('date', '')
-            date_obj = None
-            if date_str:
-                try:
-                    day, month, year = map(int, date_str.split('-'))
-                    date_obj = datetime(year, month, day)
-                except: pass
-            posts_with_dates.append({
-                'post': post,
-                'title': metadata.get('title', post['path'].split('/')[-1]),
-                'date_str': date_str,
-                'date_obj': date_obj
-            })
-        
-        # Sort by date descending
-        posts_with_dates.sort(
-            key=lambda x: (x['date_obj'] is None, x['date_obj'] or datetime.min),
-            reverse=True
-        )
-        
-        # Generate display name for category
-        display_category = ' '.join([part.capitalize() for part in category.split('-')])
-        content = f"<h1>{display_category}</h1>"
-        
-        if subcategories:
-            content += "<h2>Subcategories</h2><ul class='subcategory-list'>"
-            for sub, count in sorted(subcategories.items()):
-                sub_parts = sub.split('/')
-                sub_display = ' '.join([p.capitalize() for p in sub_parts[-1].split('-')])
-                content += f"""
-                    <li class='post-item'>
-                        <a href='/category/{sub}'>{sub_display}</a>
-                        <span class='category'>({count} post{'s' if count != 1 else ''})</span>
-                    </li>
-                """
-            content += "</ul>"
-        
-        if posts_with_dates:
-            content += "<h2>Posts</h2><ul class='post-list'>"
-            for item in posts_with_dates:
-                content += f"""
-                    <li class='post-item'>
-                        <div class="post-header">
-                            <a href="/{item['post']['path']}">{item['title']}</a>
-                            {f"<span class='post-date'>{item['date_str']}</span>" if item['date_str'] else ""}
-                        </div>
-                    </li>
-                """
-            content += "</ul>"
+        offset, limit, after = listing_window()
+        try:
+            subcategories, posts_with_dates, offset, total = blog_manager.categories.category_page(
+                category, offset, limit, after)
+        except KeyError:
+            abort(404)
         
-        return TemplateRenderer.render_page(
-            title=f"Category: {display_category}",
-            content=content,
-            breadcrumbs=generate_breadcrumbs(category)
+        display_category = display_name(category)
+        return render_listing(
+            f"Category: {display_category}",
+            'category.html',
+            len(posts_with_dates),
+            breadcrumbs=generate_breadcrumbs(category),
+            category=category,
+            subcategories=subcategories if not offset else [],
+            posts=posts_with_dates,
+            pages=pagination(offset, posts_with_dates, total)
         )
+    except HTTPException:
+        raise  # Bad pages and cursors are real 404s, not error pages served with 200
     except Exception as e:
         app.logger.error(f"Category error: {str(e)}")
+        g.cacheable = False
         return TemplateRenderer.render_page(
             title="Error",
             content="",
@@ -476,6 +3029,7 @@ def category_posts(category):
         )
 
 @app.route("/<path:filename>")
+@cached_page('post')
 def serve_post(filename):
     """Serve individual blog post"""
     try:
@@ -489,24 +3043,13 @@ def serve_post(filename):
         metadata = post_data['metadata']
         breadcrumbs = generate_breadcrumbs(filename)
         
-        content = f"<h1>{metadata.get('title', filename)}</h1>"
-        
-        # Add date and author
-        date = metadata.get('date', '')
-        author = metadata.get('auther', '')
-        if date or author:
-            content += f"<p class='post-meta'>"
-            if date:
-                content += f"Posted on {date}"
-            if author:
-                if date:
-                    content += " by "
-                else:
-                    content += "By "
-                content += author
-            content += "</p>"
-        
-        content += post_data['html']
+        content = TemplateRenderer.render(
+            'post.html',
+            title=metadata.get('title', filename),
+            date=metadata.get('date', ''),
+            author=metadata.get('auther', ''),
+            html=post_data['html']
+        )
         
         return TemplateRenderer.render_page(
             title=metadata.get('title', filename),
@@ -515,6 +3058,7 @@ def serve_post(filename):
         )
     except Exception as e:
         app.logger.error(f"Post error: {str(e)}")
+        g.cacheable = False
         return TemplateRenderer.render_page(
             title="Error",
             content="",
@@ -522,85 +3066,104 @@ def serve_post(filename):
         )
 
 @app.route("/")
+@cached_page('home')
 def home():
     """Render home page with categorized post list"""
     try:
-        posts = blog_manager.list_posts()
-        categories = {}
-        
-        # Organize posts by top-level category
-        for post in posts:
-            parts = post['path'].split('/')
-            if len(parts) == 1:
-                category = '_root'
-            else:
-                category = parts[0]
-            
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(post)
-        
-        # Generate content
-        content = "<h1>Home</h1><hr style='margin-top: -20px; margin-bottom: 20px; border: 2px solid #000;'>"  # Updated <hr> tag
-        for category_name, posts_in_category in sorted(categories.items()):
-            # Generate display name for category
-            if category_name == '_root':
-                display_name = "Uncategorized"
-            else:
-                display_name = ' '.join([part.capitalize() for part in category_name.split('-')])
-            
-            content += f"<h2><a href='/category/{category_name}'>{display_name}</a></h2>"
-            
-            # Sort posts by date (newest first)
-            dated_posts = []
-            for post in posts_in_category:
-                post_data = blog_manager.get_post(post['path'])
-                if not post_data: continue
-                metadata = post_data['metadata']
-                date_str = metadata.get('date', '')
-                date_obj = None
-                if date_str:
-                    try:
-                        day, month, year = map(int, date_str.split('-'))
-                        date_obj = datetime(year, month, day)
-                    except: pass
-                dated_posts.append({
-                    'post': post,
-                    'title': metadata.get('title', post['path'].split('/')[-1]),
-                    'date_str': date_str,
-                    'date_obj': date_obj
-                })
-            
-            # Sort by date descending
-            dated_posts.sort(
-                key=lambda x: (x['date_obj'] is None, x['date_obj'] or datetime.min),
-                reverse=True
-            )
-            
-            content += "<ul class='post-list'>"
-            for item in dated_posts:
-                content += f"""
-                    <li class='post-item'>
-                        <div class="post-header">
-                            <a href="/{item['post']['path']}">{item['title']}</a>
-                            {f"<span class='post-date'>{item['date_str']}</span>" if item['date_str'] else ""}
-                        </div>
-                    </li>
-                """
-            content += "</ul>"
+        offset, limit, after = listing_window()
+        try:
+            groups, offset, total = blog_manager.categories.home_page(offset, limit, after)
+        except KeyError:
+            abort(404)
+        posts = [item for _, items in groups for item in items]
         
-        return TemplateRenderer.render_page(
-            title="Blogs",
-            content=content
+        return render_listing(
+            "Blogs",
+            'home.html',
+            len(posts),
+            groups=groups,
+            pages=pagination(offset, posts, total)
         )
+    except HTTPException:
+        raise  # Bad pages and cursors are real 404s, not error pages served with 200
     except Exception as e:
         app.logger.error(f"Home error: {str(e)}")
+        g.cacheable = False
         return TemplateRenderer.render_page(
             title="Error",
             content="",
             error={'title': 'Home Error', 'description': str(e)}
         )
 
+def site_url():
+    """Base URL for absolute links, without a trailing slash"""
+    return (config.SITE_URL or request.host_url).rstrip('/')
+
+def w3c_datetime(value):
+    """Format a UTC timestamp or naive UTC datetime for Atom and sitemaps"""
+    if not isinstance(value, datetime):
+        value = datetime.fromtimestamp(value, timezone.utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def post_modified(path):
+    """Return a post's file mtime as a timestamp, or None if it is gone"""
+    signature = blog_manager.catalog.signature(path)
+    return signature[0] / 1e9 if signature else None
+
+@app.route("/feed.xml")
+@cached_page('feed', mimetype='application/atom+xml')
+def feed():
+    """Atom feed of the newest dated posts, rebuilt only when a post changes"""
+    entries = []
+    for item, published in blog_manager.categories.newest(config.FEED_SIZE):
+        modified = post_modified(item.path)
+        if not is_safe_path(item.path) or modified is None:
+            continue
+        entries.append({
+            'title': item.title,
+            'path': item.path,
+            'published': w3c_datetime(published),
+            'updated': w3c_datetime(modified),
+        })
+    updated = max((entry['updated'] for entry in entries), default=w3c_datetime(blog_manager.categories.root.last_modified))
+    return TemplateRenderer.render('feed.xml', title=config.FEED_TITLE, site_url=site_url(), updated=updated, entries=entries)
+
+def sitemap_urls():
+    """Return (path, last modified timestamp or None) for every listed page, in a stable order"""
+    categories = blog_manager.categories
+    urls = [('/', categories.root.last_modified)]
+    urls.extend((f"/category/{quote(path)}", modified) for path, modified in categories.categories())
+    for path in categories.paths():
+        modified = post_modified(path)
+        if is_safe_path(path) and modified is not None:
+            urls.append((f"/{path}", modified))
+    return urls
+
+def sitemap_chunks(urls):
+    """Split the sitemap URLs into files of at most SITEMAP_SIZE entries"""
+    size = max(1, min(config.SITEMAP_SIZE, 50000))
+    return [urls[start:start + size] for start in range(0, len(urls), size)]
+
+@app.route("/sitemap.xml")
+@cached_page('sitemap', mimetype='application/xml')
+def sitemap():
+    """Sitemap index pointing at the numbered sitemap files, rebuilt only when a post changes"""
+    sitemaps = []
+    for number, chunk in enumerate(sitemap_chunks(sitemap_urls()), 1):
+        modified = max((modified for _, modified in chunk if modified), default=None)
+        sitemaps.append((f"/sitemap-{number}.xml", w3c_datetime(modified) if modified else None))
+    return TemplateRenderer.render('sitemap-index.xml', site_url=site_url(), sitemaps=sitemaps)
+
+@app.route("/sitemap-<int:number>.xml")
+@cached_page('sitemap', mimetype='application/xml')
+def sitemap_part(number):
+    """One sitemap file of at most SITEMAP_SIZE listed pages with their last modification times"""
+    chunks = sitemap_chunks(sitemap_urls())
+    if not 1 <= number <= len(chunks):
+        abort(404)
+    urls = [(loc, w3c_datetime(modified) if modified else None) for loc, modified in chunks[number - 1]]
+    return TemplateRenderer.render('sitemap.xml', site_url=site_url(), urls=urls)
+
 @app.errorhandler(404)
 def page_not_found(e):
     return TemplateRenderer.render_page(
@@ -609,6 +3172,15 @@ def page_not_found(e):
         error={'title': '404 Not Found', 'description': e.description}
     ), 404
 
+@app.errorhandler(503)
+def service_unavailable(e):
+    headers = {'Retry-After': str(e.retry_after)} if getattr(e, 'retry_after', None) else {}
+    return TemplateRenderer.render_page(
+        title="Busy",
+        content="",
+        error={'title': '503 Service Unavailable', 'description': e.description}
+    ), 503, headers
+
 @app.errorhandler(500)
 def internal_error(e):
     return TemplateRenderer.render_page(
@@ -617,7 +3189,204 @@ def internal_error(e):
         error={'title': '500 Server Error', 'description': e.description}
     ), 500
 
+def export_pages():
+    """Return {url: etag} for every page a static export should contain"""
+    pages = {'/': page_etag('home')}
+    if config.SITE_URL:
+        pages['/feed.xml'] = page_etag('feed')
+        pages['/sitemap.xml'] = page_etag('sitemap')
+        for number in range(1, len(sitemap_chunks(sitemap_urls())) + 1):
+            pages[f"/sitemap-{number}.xml"] = page_etag('sitemap', number)
+    else:
+        # Their links would point at the exporting test client's http://localhost/
+        logging.warning("BLOG_SITE_URL is not set: skipping feed.xml and the sitemaps in the export")
+    for category, _ in blog_manager.categories.categories():
+        pages[f"/category/{category}"] = page_etag('category', category)
+    for path in blog_manager.list_posts():
+        if is_safe_path(path):
+            pages[f"/{path}"] = page_etag('post', path)
+    return {url: version[0] for url, version in pages.items() if version is not None}
+
+def export_file(url):
+    """Map a page URL to its file inside the export directory"""
+    if url.endswith('.xml'):
+        return url.strip('/')
+    return 'index.html' if url == '/' else os.path.join(*url.strip('/').split('/'), 'index.html')
+
+def _export_job(job):
+    """Render one page through the app and write it, returning (url, etag or None)"""
+    url, output_dir = job
+    try:
+        # Static hosts cannot serve ?page= variants, so listings are exported whole
+        response = app.test_client().get(url, query_string={'page': 'all'}, environ_base={'blog.export': True})
+        etag = response.headers.get('ETag', '').strip('"') or None
+        if response.status_code != 200 or etag is None:
+            logging.error(f"Export of {url} failed with status {response.status_code}")
+            return url, None
+        file_path = os.path.join(output_dir, export_file(url))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path + '.tmp', 'wb') as f:
+            f.write(response.get_data())
+        os.replace(file_path + '.tmp', file_path)
+        return url, etag
+    except Exception as e:
+        logging.error(f"Export of {url} failed: {str(e)}")
+        return url, None
+
+def export_assets(output_dir, previous):
+    """Copy the md folder's images and attachments, plus listing thumbnails, into output_dir
+
+    previous maps exported files to the content hash they were written
+    from, so unchanged files are skipped. Returns (the new map, files
+    written, files removed).
+    """
+    assets = blog_manager.assets
+    width = BlogConfig.THUMBNAIL_WIDTH
+    current = {}
+    sources = {}
+    for root, dirs, files in os.walk(assets.md_folder):
+        dirs[:] = [d for d in dirs if AssetStore.SEGMENT_RE.match(d)]
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), assets.md_folder).replace(os.sep, '/')
+            found = assets.resolve(rel)
+            if found is None:
+                continue
+            file_path, st = found
+            digest = assets.digest(file_path, st)
+            current[rel] = digest
+            sources[rel] = (file_path, digest, None)
+            if os.path.splitext(rel)[1].lower() in AssetStore.RESIZABLE:
+                thumbnail = f"{EXPORT_THUMBNAILS}/{width}/{rel}"
+                current[thumbnail] = digest
+                sources[thumbnail] = (file_path, digest, width)
+
+    written = 0
+    for rel, (file_path, digest, resize) in sources.items():
+        target = os.path.join(output_dir, *rel.split('/'))
+        if previous.get(rel) == digest and os.path.isfile(target):
+            continue
+        if resize:
+            # Narrow images, or no Pillow, leave the original as the thumbnail
+            file_path = assets.variant(file_path, digest, resize) or file_path
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(file_path, target + '.tmp')
+            os.replace(target + '.tmp', target)
+            written += 1
+        except OSError as e:
+            logging.error(f"Export of {rel} failed: {str(e)}")
+            current.pop(rel)
+
+    removed = [rel for rel in previous if rel not in current]
+    for rel in removed:
+        target = os.path.join(output_dir, *rel.split('/'))
+        try:
+            os.remove(target)
+            os.removedirs(os.path.dirname(target))
+        except OSError:
+            pass
+    return current, written, len(removed)
+
+def export_site(output_dir, workers=None, full=False):
+    """Write every page to output_dir, re-rendering only pages whose inputs changed"""
+    started = time.perf_counter()
+    output_dir = os.path.abspath(output_dir)
+    manifest_path = os.path.join(output_dir, '.export-manifest.json')
+    manifest = {}
+    asset_manifest = {}
+    if not full and os.path.isfile(manifest_path):
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                previous = json.load(f)
+            manifest = previous.get('pages', {})
+            asset_manifest = previous.get('assets', {})
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable export manifest: {str(e)}")
+
+    pages = export_pages()
+    stale = [
+        url for url, etag in pages.items()
+        if manifest.get(url) != etag or not os.path.isfile(os.path.join(output_dir, export_file(url)))
+    ]
+    removed = [url for url in manifest if url not in pages]
+    logging.info(f"Exporting {len(stale)} of {len(pages)} pages to {output_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    stylesheet_path = os.path.join(output_dir, 'assets', f"style.{TemplateRenderer.stylesheet_version}.css")
+    if not os.path.isfile(stylesheet_path):
+        os.makedirs(os.path.dirname(stylesheet_path), exist_ok=True)
+        with open(stylesheet_path, 'wb') as f:
+            f.write(TemplateRenderer.stylesheet)
+
+    jobs = [(url, output_dir) for url in stale]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        results = list(map(_export_job, jobs))
+    else:
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            chunksize = max(1, min(64, len(jobs) // (workers * 4) or 1))
+            results = list(pool.map(_export_job, jobs, chunksize=chunksize))
+
+    written = 0
+    for url, etag in results:
+        if etag is None:
+            manifest.pop(url, None)
+        else:
+            manifest[url] = etag
+            written += 1
+
+    for url in removed:
+        manifest.pop(url, None)
+        file_path = os.path.join(output_dir, export_file(url))
+        try:
+            os.remove(file_path)
+            os.removedirs(os.path.dirname(file_path))
+        except OSError:
+            pass
+
+    asset_manifest, assets_written, assets_removed = export_assets(output_dir, asset_manifest)
+
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'pages': manifest, 'assets': asset_manifest}, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    elapsed = time.perf_counter() - started
+    logging.info(f"Export finished: {written} written, {len(removed)} removed, {len(pages) - len(stale)} unchanged, "
+                 f"{assets_written} asset files written, {assets_removed} removed, {elapsed:.2f}s")
+    return {'pages': len(pages), 'written': written, 'removed': len(removed),
+            'assets_written': assets_written, 'assets_removed': assets_removed, 'seconds': elapsed}
+
+@app.cli.command("export")
+@click.argument("output_dir")
+@click.option("--workers", type=int, default=config.WARM_WORKERS, help="Render processes (default: CPU count)")
+@click.option("--full", is_flag=True, help="Ignore the manifest and re-render every page")
+def export_command(output_dir, workers, full):
+    """Write the site as static HTML for serving straight from disk"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    export_site(output_dir, workers, full)
+
+@app.cli.command("warm")
+@click.option("--workers", type=int, default=config.WARM_WORKERS, help="Render processes (default: CPU count)")
+def warm_command(workers):
+    """Render all posts in parallel and fill the render cache"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    blog_manager.warm_up(workers)
+
+def prepare_for_serving():
+    """Warm caches before serving; under a pre-forking server this runs once in the master"""
+    if config.WARM_ON_START:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        blog_manager.warm_up(config.WARM_WORKERS)
+    if config.PRELOAD_SEARCH_INDEX:
+        blog_manager.sync_search_index()
+    # Keep the preloaded catalog and indexes out of GC scans so forked workers share their pages
+    gc.freeze()
+
 if __name__ == "__main__":
+    prepare_for_serving()
+    if config.WATCH_MD_FOLDER:
+        blog_manager.catalog.start_watching(config.CATALOG_POLL_INTERVAL, config.CATALOG_POLL)
     app.run(
         debug=config.DEBUG,
         host=config.HOST,
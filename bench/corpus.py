@@ -0,0 +1,128 @@
+"""Synthetic markdown trees for benchmarking
+
+Run with: python -m bench.corpus OUTPUT_DIR [--posts N] [--depth N] [--fanout N] [--body-words N]
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+from datetime import date, timedelta
+
+WORDS = [
+    'python', 'flask', 'markdown', 'cache', 'index', 'render', 'search', 'deploy',
+    'docker', 'latency', 'thread', 'worker', 'template', 'category', 'journey',
+    'travel', 'recipe', 'coffee', 'mountain', 'garden', 'music', 'design', 'memory',
+    'network', 'server', 'client', 'query', 'binary', 'vector', 'stream',
+]
+
+CATEGORY_WORDS = ['tech', 'life', 'travel', 'notes', 'projects', 'reading', 'food', 'ideas']
+
+# Front-matter shapes found in real posts; 'auther' is the spelling serve_post reads
+VARIANTS = ('full', 'auther', 'author', 'iso-date', 'no-date', 'none', 'broken')
+
+
+def category_paths(rng, depth, fanout):
+    """Return every folder of a tree with the given depth and fanout, '' for the root"""
+    folders = ['']
+    level = ['']
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            words = rng.sample(CATEGORY_WORDS, len(CATEGORY_WORDS))
+            for i in range(fanout):
+                name = words[i % len(words)]
+                if fanout > len(words):
+                    name = f"{name}-{i}"
+                next_level.append(f"{parent}/{name}" if parent else name)
+        folders.extend(next_level)
+        level = next_level
+    return folders
+
+
+def front_matter(rng, variant, title, day):
+    """Return the YAML header for one post"""
+    date_str = day.strftime('%d-%m-%Y')
+    tags = ', '.join(rng.sample(WORDS, 2))
+    if variant == 'full':
+        return f'---\ntitle: "{title}"\ndate: "{date_str}"\nauthor: "Bench Author"\nauther: "Bench Author"\ntags: [{tags}]\n---\n'
+    if variant == 'auther':
+        return f'---\ntitle: "{title}"\ndate: "{date_str}"\nauther: "Bench Author"\n---\n'
+    if variant == 'author':
+        return f'---\ntitle: "{title}"\ndate: "{date_str}"\nauthor: "Bench Author"\n---\n'
+    if variant == 'iso-date':
+        return f'---\ntitle: "{title}"\ndate: {day.isoformat()}\n---\n'
+    if variant == 'no-date':
+        return f'---\ntitle: "{title}"\n---\n'
+    if variant == 'broken':
+        return f'---\ntitle: "{title}\ndate: [unclosed\n---\n'
+    return ''
+
+
+def body(rng, words):
+    """Return a markdown body of roughly the given number of words"""
+    blocks = []
+    written = 0
+    section = 0
+    while written < words:
+        section += 1
+        paragraph = [rng.choice(WORDS) for _ in range(min(60, words - written) or 1)]
+        written += len(paragraph)
+        blocks.append(f"## Section {section}")
+        blocks.append(' '.join(paragraph).capitalize() + '.')
+        if section % 3 == 0:
+            blocks.append('\n'.join(f"- {rng.choice(WORDS)} [link](https://example.com/{i})" for i in range(3)))
+        if section % 4 == 0:
+            blocks.append(f"```\n{rng.choice(WORDS)} = {section}\n```")
+    return '\n\n'.join(blocks) + '\n'
+
+
+def generate(root, posts=1000, depth=2, fanout=4, body_words=300, variants=VARIANTS, seed=0):
+    """Write a synthetic md/ tree under root, returning the post paths without .md"""
+    rng = random.Random(seed)
+    folders = category_paths(rng, depth, fanout)
+    paths = []
+    for i in range(posts):
+        folder = rng.choice(folders)
+        name = f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}"
+        path = f"{folder}/{name}" if folder else name
+        day = date(2015, 1, 1) + timedelta(days=rng.randrange(10 * 365))
+        title = ' '.join(word.capitalize() for word in name.split('-')[:2]) + f" {i}"
+
+        file_path = os.path.join(root, path + '.md')
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(front_matter(rng, rng.choice(variants), title, day))
+            f.write(body(rng, body_words))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--body-words', type=int, default=300)
+    parser.add_argument('--variants', default=','.join(VARIANTS),
+                        help=f"comma-separated front-matter variants to mix ({', '.join(VARIANTS)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clean', action='store_true', help="remove the output directory first")
+    args = parser.parse_args()
+
+    variants = tuple(v for v in args.variants.split(',') if v)
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f"unknown variants: {', '.join(sorted(unknown))}")
+    if args.clean:
+        shutil.rmtree(args.output, ignore_errors=True)
+
+    started = time.perf_counter()
+    paths = generate(args.output, args.posts, args.depth, args.fanout, args.body_words, variants, args.seed)
+    print(f"wrote {len(paths)} posts to {args.output} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""Memory held by the post catalog, listing indexes and search index, per post
+
+Run with: python -m bench.memory [--posts N] [--body-words N] [--output FILE]
+
+Builds a BlogManager over a synthetic tree with tracemalloc running and
+reports the bytes it retains per post, split into the file catalog, the
+listing indexes (categories and suggestions) and the search index, plus the
+allocations made by one listing request.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.corpus import generate
+
+
+def retained(build):
+    """Return (result, bytes still allocated after build() returns)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def allocated(call, repeat=10):
+    """Return the peak bytes allocated by one call"""
+    call()
+    peak = 0
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        call()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--body-words', type=int, default=120, help="words per post body (about 0.8 KB of markdown)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='blog-bench-') as scratch:
+        md_folder = os.path.join(scratch, 'md')
+        generate(md_folder, args.posts, args.depth, args.fanout, body_words=args.body_words, seed=args.seed)
+
+        os.environ['BLOG_MD_FOLDER'] = os.path.join(scratch, 'empty')
+        os.environ['BLOG_RENDER_CACHE_PATH'] = ''
+        os.environ['BLOG_WATCH_MD_FOLDER'] = '0'
+        os.environ['BLOG_METRICS'] = '0'
+        logging.disable(logging.CRITICAL)
+        import app
+
+        def build_catalog():
+            catalog = app.PostCatalog(md_folder)
+            catalog.scan()
+            return catalog
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        catalog, catalog_bytes = retained(build_catalog)
+        del catalog
+        manager, total_bytes = retained(lambda: app.BlogManager(md_folder, render_cache_path=None))
+        build_seconds = time.perf_counter() - started
+        posts = len(manager.catalog)
+
+        def build_search_index():
+            manager.sync_search_index()
+            # Indexing renders every post; only what the index itself keeps is counted
+            manager.post_cache.clear()
+            return manager.search_index
+
+        started = time.perf_counter()
+        _, search_bytes = retained(build_search_index)
+        search_seconds = time.perf_counter() - started
+
+        page_size = app.BlogConfig.PAGE_SIZE or None
+        listing_bytes = allocated(lambda: manager.categories.home_page(0, page_size))
+        list_posts_bytes = allocated(manager.list_posts)
+        tracemalloc.stop()
+
+    report = {
+        'posts': posts,
+        'python': sys.version.split()[0],
+        'build_s': round(build_seconds, 3),
+        'bytes_per_post': round(total_bytes / posts, 1),
+        'catalog_bytes_per_post': round(catalog_bytes / posts, 1),
+        'index_bytes_per_post': round((total_bytes - catalog_bytes) / posts, 1),
+        'search_index_s': round(search_seconds, 3),
+        'search_index_bytes_per_post': round(search_bytes / posts, 1),
+        'home_page_alloc_bytes': listing_bytes,
+        'list_posts_alloc_bytes': list_posts_bytes,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
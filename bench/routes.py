@@ -0,0 +1,275 @@
+"""Latency, throughput and memory benchmark for every route of the app
+
+Run with: python -m bench.routes [--md DIR | --posts N --depth N --body-words N]
+                                 [--requests N] [--concurrency 1,8] [--output FILE] [--baseline FILE]
+
+Each route runs in a forked child of a process that has already loaded the
+app and built the search index, as a preloading gunicorn master does, so peak
+RSS is reported per route and the post and response caches start cold for
+every run. Requests the search admission limiter turns away with 503 are
+counted as rejected, apart from errors.
+Results are written as JSON; pass an earlier run as --baseline to print the
+change in latency and throughput.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from bench.corpus import VARIANTS, WORDS, generate
+
+ROUTES = ('home', 'category', 'post', 'search', 'suggest')
+
+
+def load_app(md_folder, render_cache, search_slots=None):
+    """Import the app configured for md_folder and build its search index
+
+    search_slots, if given, admits that many concurrent searches with no
+    time budget, so the limiter neither queues nor sheds any.
+
+    Returns (module, startup seconds, indexing seconds).
+    """
+    os.environ['BLOG_MD_FOLDER'] = md_folder
+    os.environ['BLOG_RENDER_CACHE_PATH'] = render_cache or ''
+    os.environ['BLOG_WATCH_MD_FOLDER'] = '0'
+    os.environ['BLOG_DEBUG'] = '0'
+    if search_slots:
+        os.environ['BLOG_SEARCH_CONCURRENCY'] = str(search_slots)
+        os.environ['BLOG_SEARCH_TIME_BUDGET'] = '0'
+    # The 'broken' front-matter variant logs a YAML error per post
+    logging.disable(logging.CRITICAL)
+    started = time.perf_counter()
+    import app
+    startup = time.perf_counter() - started
+    started = time.perf_counter()
+    app.blog_manager.sync_search_index()
+    # Indexing rendered every post; drop them so the post route still measures cold renders
+    app.blog_manager.post_cache.clear()
+    return app, startup, time.perf_counter() - started
+
+
+def route_urls(blog, rng, count):
+    """Return {route: [urls]} sampled from the loaded corpus"""
+    posts = list(blog.blog_manager.list_posts())
+    categories = []
+    nodes = list(blog.blog_manager.categories.root.children.values())
+    while nodes:
+        node = nodes.pop()
+        categories.append(node.path)
+        nodes.extend(node.children.values())
+    queries = WORDS + [f"{a} {b}" for a, b in zip(WORDS, WORDS[1:])]
+    return {
+        'home': ['/'],
+        'category': [f"/category/{c}" for c in rng.sample(categories, min(count, len(categories)))],
+        'post': [f"/{p}" for p in rng.sample(posts, min(count, len(posts)))],
+        'search': [f"/search?q={q.replace(' ', '+')}" for q in queries],
+        'suggest': [f"/search/suggest?q={q[:rng.randint(1, 5)]}" for q in queries],
+    }
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+
+def measure(flask_app, urls, requests, concurrency, rng):
+    """Issue requests over urls from concurrent test clients and summarise the latencies"""
+    plan = [rng.choice(urls) for _ in range(requests)]
+    latencies = []
+    errors = []
+    rejected = []
+    lock = threading.Lock()
+
+    first_client = flask_app.test_client()
+    started = time.perf_counter()
+    first = first_client.get(plan[0])
+    first.get_data()
+    first_ms = (time.perf_counter() - started) * 1000
+
+    def run(chunk):
+        client = flask_app.test_client()
+        local = []
+        failed = 0
+        shed = 0
+        for url in chunk:
+            started = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            local.append(time.perf_counter() - started)
+            if response.status_code == 503:
+                shed += 1
+            elif response.status_code >= 400:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+            rejected.append(shed)
+
+    chunks = [plan[i::concurrency] for i in range(concurrency)]
+    threads = [threading.Thread(target=run, args=(chunk,)) for chunk in chunks]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rejected': sum(rejected),
+        'first_ms': round(first_ms, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _isolated(conn, flask_app, urls, requests, concurrency, seed):
+    try:
+        result = measure(flask_app, urls, requests, concurrency, random.Random(seed))
+        result['peak_rss_bytes'] = peak_rss()
+        conn.send(result)
+    except Exception as e:
+        conn.send({'error': str(e)})
+    finally:
+        conn.close()
+
+
+def run_route(flask_app, urls, requests, concurrency, seed, isolate=True):
+    """Measure one route, in a forked child unless isolate is False"""
+    if not isolate:
+        result = measure(flask_app, urls, requests, concurrency, random.Random(seed))
+        result['peak_rss_bytes'] = peak_rss()
+        return result
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_isolated, args=(child, flask_app, urls, requests, concurrency, seed))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    return result
+
+
+def compare(results, baseline):
+    """Print the change against a previous run, matching rows by route and concurrency"""
+    previous = {(row['route'], row['concurrency']): row for row in baseline['results']}
+    print(f"{'route':<10} {'conc':>4} {'p50':>9} {'p95':>9} {'throughput':>11}", file=sys.stderr)
+    for row in results:
+        old = previous.get((row['route'], row['concurrency']))
+        if old is None:
+            continue
+
+        def change(key):
+            return f"{(row[key] / old[key] - 1) * 100:+.1f}%" if old[key] else 'n/a'
+        print(f"{row['route']:<10} {row['concurrency']:>4} {change('p50_ms'):>9} {change('p95_ms'):>9} "
+              f"{change('throughput_rps'):>11}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--md', help="benchmark an existing md/ tree instead of generating one")
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--body-words', type=int, default=300)
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--requests', type=int, default=200, help="requests per route and concurrency level")
+    parser.add_argument('--concurrency', default='1,8', help="comma-separated numbers of concurrent clients")
+    parser.add_argument('--routes', default=','.join(ROUTES))
+    parser.add_argument('--render-cache', help="SQLite render cache to use (default: none, every run starts cold)")
+    parser.add_argument('--no-isolate', action='store_true', help="run every route in this process")
+    parser.add_argument('--no-search-limit', action='store_true',
+                        help="admit every concurrent search with no time budget, to measure search itself")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write JSON results here instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    routes = [route for route in args.routes.split(',') if route]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+
+    with tempfile.TemporaryDirectory(prefix='blog-bench-') as scratch:
+        md_folder = args.md
+        corpus = {'md': md_folder}
+        if md_folder is None:
+            md_folder = os.path.join(scratch, 'md')
+            variants = tuple(v for v in args.variants.split(',') if v)
+            started = time.perf_counter()
+            generate(md_folder, args.posts, args.depth, args.fanout, args.body_words, variants, args.seed)
+            corpus = {
+                'posts': args.posts, 'depth': args.depth, 'fanout': args.fanout,
+                'body_words': args.body_words, 'variants': list(variants), 'seed': args.seed,
+                'generate_s': round(time.perf_counter() - started, 3),
+            }
+
+        blog, startup, indexing = load_app(md_folder, args.render_cache,
+                                           max(levels) if args.no_search_limit else None)
+        startup_rss = peak_rss()
+        urls = route_urls(blog, random.Random(args.seed), args.requests)
+        results = []
+        for route in routes:
+            for concurrency in levels:
+                result = run_route(blog.app, urls[route], args.requests, concurrency, args.seed,
+                                   isolate=not args.no_isolate)
+                results.append(dict(route=route, concurrency=concurrency, **result))
+                print(f"{route:<10} x{concurrency:<3} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                      f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s  "
+                      f"rss {result['peak_rss_bytes'] / 2 ** 20:6.1f} MiB  503s {result['rejected']}", file=sys.stderr)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'corpus': corpus,
+                'posts_loaded': len(blog.blog_manager.list_posts()),
+                'startup_s': round(startup, 3),
+                'index_s': round(indexing, 3),
+                'startup_rss_bytes': startup_rss,
+                'requests': args.requests,
+                'search_limit': not args.no_search_limit,
+            },
+            'results': results,
+        }
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 1 if any(row['errors'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
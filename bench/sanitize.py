@@ -0,0 +1,124 @@
+"""Differential check and micro-benchmark for app.sanitize_html
+
+Run with: python -m bench.sanitize [--posts N] [--paragraphs N] [--repeat N]
+"""
+import argparse
+import random
+import time
+
+import markdown
+from bs4 import BeautifulSoup, Comment
+
+from app import HTMLSanitizer, sanitize_html_with_text
+
+SAMPLES = [
+    '<p>plain <b>bold</b> &amp; &lt;escaped&gt; text</p>',
+    '<p>before<script>alert(1)</script>after</p>',
+    '<div><style>p { color: red }</style><p>styled</p></div>',
+    '<iframe src="https://example.com"><p>inside</p></iframe><p>outside</p>',
+    '<iframe src="x"><iframe src="y"></iframe>still inside</iframe><p>after</p>',
+    '<p onclick="steal()" class="x">handler</p>',
+    '<a href="javascript:alert(1)">js link</a> <a href=" JaVa\tScRiPt:alert(1)">mixed</a>',
+    '<a href="https://example.com/?a=1&amp;b=2" title="q &quot;uoted&quot;">ok</a>',
+    '<img src="a.png" alt="pic" onerror="x()"><br><hr/>',
+    '<p>unclosed <em>emphasis</p><p>next</p>',
+    'stray </div> end tag <span>and unclosed span',
+    '<!-- a comment --><p>after comment</p>',
+    '<p>a<!-- x --!><img src=x onerror=alert(1)> -->b</p>',
+    '<object data="javascript:alert(1)"></object><object data="movie.swf"></object>',
+    '<img srcset="a.png 1x, javascript:alert(1) 2x"><img srcset="a.png 1x, b.png 2x">',
+    '<meta http-equiv="refresh" content="0;url=javascript:alert(1)">',
+    '<pre><code>if (a &lt; b) { return &quot;x&quot;; }</code></pre>',
+    '<table><tr><td>1</td><td>2</td></tr></table>',
+    '<input type="checkbox" checked disabled>',
+    '&#169; &copy; &nbsp; café',
+]
+
+WORDS = ['alpha', '**beta**', '`gamma`', '[link](https://example.com)', 'delta', '_epsilon_', 'zeta & eta']
+
+
+def bs4_sanitize_html(html):
+    """The original BeautifulSoup-based sanitizer, kept as the reference"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all():
+        if tag.name in ['script', 'iframe', 'style']:
+            tag.decompose()
+    return str(soup)
+
+
+def reference(html):
+    """Reference output with the sanitizer's stricter attribute rules applied"""
+    soup = BeautifulSoup(bs4_sanitize_html(html), 'html.parser')
+    for comment in soup.find_all(string=lambda node: isinstance(node, Comment)):
+        comment.extract()
+    # Parse again so the text on either side of a removed comment joins, as it does for scripts
+    soup = BeautifulSoup(str(soup), 'html.parser')
+    for tag in soup.find_all():
+        for name, value in list(tag.attrs.items()):
+            if isinstance(value, list):
+                value = ' '.join(value)
+            if HTMLSanitizer._unsafe_attr(name, value):
+                del tag[name]
+    return str(soup), soup.get_text()
+
+
+def make_post(rng, paragraphs):
+    """Render a synthetic markdown post to HTML"""
+    blocks = []
+    for i in range(paragraphs):
+        blocks.append(f"## Section {i}")
+        blocks.append(' '.join(rng.choice(WORDS) for _ in range(120)))
+        blocks.append('\n'.join(f"- item {rng.choice(WORDS)}" for _ in range(5)))
+        blocks.append(rng.choice(SAMPLES))
+    return markdown.markdown('\n\n'.join(blocks))
+
+
+def check(documents):
+    """Compare the sanitizer with the reference, returning the number of mismatches"""
+    failures = 0
+    for html in documents:
+        sanitized, text = sanitize_html_with_text(html)
+        expected_html, expected_text = reference(html)
+        if str(BeautifulSoup(sanitized, 'html.parser')) != expected_html or text != expected_text:
+            failures += 1
+            print(f"MISMATCH for {html[:80]!r}")
+    return failures
+
+
+def timed(func, documents, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in documents:
+            func(html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--paragraphs', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [make_post(rng, args.paragraphs) for _ in range(args.posts)]
+
+    failures = check(SAMPLES + documents)
+    print(f"differential check: {len(SAMPLES) + len(documents)} documents, {failures} mismatches")
+
+    size = sum(len(html) for html in documents)
+    old = timed(bs4_sanitize_html, documents, args.repeat)
+    new = timed(lambda html: sanitize_html_with_text(html), documents, args.repeat)
+    old_with_text = timed(lambda html: BeautifulSoup(bs4_sanitize_html(html), 'html.parser').get_text(), documents, args.repeat)
+    print(f"corpus: {args.posts} posts, {size / 1024:.0f} KiB of HTML")
+    print(f"beautifulsoup sanitize:          {old * 1000:8.1f} ms")
+    print(f"beautifulsoup sanitize + text:   {old_with_text * 1000:8.1f} ms")
+    print(f"html.parser sanitize + text:     {new * 1000:8.1f} ms  ({old_with_text / new:.1f}x faster)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
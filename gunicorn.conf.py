@@ -0,0 +1,32 @@
+"""Production server settings: gunicorn -c gunicorn.conf.py app:app
+
+Workers are forked from a master that has already loaded the post catalog,
+category index and search index, so they share that memory copy-on-write.
+Rendered posts live in the SQLite render cache, which every worker reads and
+writes, so a post rendered by one worker is served by the others without
+rendering it again. Only the workers watch md/ for changes: the master runs no
+background threads, so no worker is forked while one of them holds a lock.
+Each worker rescans md/ when it starts, so one respawned after a crash or a
+max_requests recycle does not serve the catalog the master loaded at startup.
+"""
+import multiprocessing
+import os
+
+import app as blog
+
+bind = f"{blog.config.HOST}:{blog.config.PORT}"
+workers = int(os.environ.get("BLOG_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("BLOG_THREADS", 4))
+timeout = int(os.environ.get("BLOG_TIMEOUT", 30))
+preload_app = True
+accesslog = "-"
+
+
+def when_ready(server):
+    blog.prepare_for_serving()
+
+
+def post_fork(server, worker):
+    if blog.config.WATCH_MD_FOLDER:
+        blog.blog_manager.after_fork(blog.config.CATALOG_POLL_INTERVAL, blog.config.CATALOG_POLL)